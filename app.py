@@ -1,9 +1,30 @@
 import os
+import signal
 from hiitpi import create_app
 
 
 app = create_app(os.getenv("FLASK_CONFIG") or "default")
 server = app.server
 
+
+def shutdown(signum, frame):
+    # Exits cleanly so the atexit hooks flush the pending workout sessions,
+    # as PID 1 in the container the default SIGTERM action is to be ignored
+    raise SystemExit(0)
+
+
 if __name__ == "__main__":
-    app.run_server(debug=False, host="0.0.0.0", port=8050, use_reloader=False)
+    host, port = server.config["HOST"], server.config["PORT"]
+    if server.config["SERVER"] == "gevent":
+        # Every request is a greenlet, so long-lived streams cost no thread
+        import gevent
+        from gevent.pywsgi import WSGIServer
+        from geventwebsocket.handler import WebSocketHandler
+
+        http_server = WSGIServer((host, port), server, handler_class=WebSocketHandler)
+        # Handled in the hub, serve_forever() returns and the process exits
+        gevent.signal_handler(signal.SIGTERM, http_server.stop)
+        http_server.serve_forever()
+    else:
+        signal.signal(signal.SIGTERM, shutdown)
+        app.run_server(debug=False, host=host, port=port, use_reloader=False)
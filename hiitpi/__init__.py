@@ -1,25 +1,30 @@
-import sys
+import hmac
+import time
 import logging
+import functools
 import datetime
 import random
-import cv2
-import pandas as pd
-from flask import Response, request, redirect, session
+from .log import setup_logging
+from .startup import StartupTimer
+
+setup_logging()
+startup = StartupTimer()
+
+from flask import (
+    Response,
+    request,
+    redirect,
+    session,
+    stream_with_context,
+    jsonify,
+)
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask_caching import Cache
 from flask_session import Session
-import plotly.express as px
-import dash
-from dash.dependencies import Input, Output, State
 
+startup.mark("import flask")
 
-logging.basicConfig(
-    stream=sys.stdout,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt=" %I:%M:%S ",
-    level="INFO",
-)
 
 logger = logging.getLogger(__name__)
 
@@ -32,16 +37,38 @@ migrate = Migrate()
 
 
 def create_app(config_name):
-    """Create a Dash app."""
+    """Create a Dash app.
+
+    Heavy dependencies are deferred: OpenCV until the first stream, pandas and
+    plotly until the first leaderboard, while the Edge TPU model loads in the
+    background. The time spent in each phase is logged once the app is ready.
+    """
+
+    import click
+    import dash
+    from dash.dependencies import Input, Output, State
+
+    startup.mark("import dash")
 
     from .config import config
-    from .model import WorkoutSession
-    from .pose import PoseEngine
-    from .camera import VideoStream
+    from .model import WorkoutSession, RepEvent
+    from .export import FORMATS
+    from .loader import ModelLoader
+    from .station import StationRegistry
+    from .watchdog import Watchdog
+    from .governor import ThermalGovernor
+    from .profiler import SamplingProfiler
     from .redisclient import RedisClient
+    from .writer import SessionWriter
+    from .leaderboard import leaderboard_figure, version, bump_version
     from .workout import WORKOUTS
     from .annotation import Annotator
-    from .layout import layout_homepage, layout_login, layout
+    from .camera import FRAMERATE, WIDTH, HEIGHT
+    from .streaming import StreamLimiter, send_acked, configure as configure_streaming
+    from .frames import JpegEncoder, encode_jpeg, blur, downscale, multipart
+    from .layout import layout_homepage, layout_login, layout, history_figure
+
+    startup.mark("import hiitpi modules")
 
     app = dash.Dash(
         __name__,
@@ -62,8 +89,14 @@ def create_app(config_name):
     app.config.suppress_callback_exceptions = True
     app.layout = layout()
 
+    startup.mark("dash app")
+
     server = app.server
     server.config.from_object(config[config_name])
+    setup_logging(
+        level=server.config["LOG_LEVEL"],
+        json_format=server.config["LOG_FORMAT"] == "json",
+    )
 
     with server.app_context():
         db.init_app(server)
@@ -74,69 +107,147 @@ def create_app(config_name):
         cache.init_app(server)
         cache.clear()
 
-    video = VideoStream()
-    model = PoseEngine(model_path=server.config["MODEL_PATH"])
+    startup.mark("flask extensions")
+
+    configure_streaming(server.config["SERVER"])
+    transport = server.config["TRANSPORT"]
+    if transport not in ("mjpeg", "websocket"):
+        raise ValueError(f"Unknown transport: {transport}")
+    if transport == "websocket" and server.config["SERVER"] != "gevent":
+        raise ValueError("The websocket transport requires SERVER=gevent")
+    limiter = StreamLimiter(server.config["MAX_STREAMS"])
+
+    model = ModelLoader(
+        server.config["MODEL_PATH"], warmup_runs=server.config["MODEL_WARMUP_RUNS"]
+    ).start()
     redis = RedisClient(
         host=server.config["REDIS_HOST"],
         port=server.config["REDIS_PORT"],
         db=server.config["REDIS_DB"],
+        backend=server.config["REDIS_BACKEND"],
+    )
+    stations = StationRegistry(server.config["STATIONS"], model=model, redis=redis)
+    if server.config["WATCHDOG"]:
+        Watchdog(
+            stations,
+            model,
+            frame_deadline=server.config["WATCHDOG_FRAME_DEADLINE"],
+            inference_deadline=server.config["WATCHDOG_INFERENCE_DEADLINE"],
+        ).start()
+    governor = ThermalGovernor(
+        stations,
+        redis,
+        root=server.config["THERMAL_SYSFS_ROOT"],
+        thresholds=server.config["THERMAL_THRESHOLDS"],
+    )
+    if server.config["THERMAL_GOVERNOR"]:
+        governor.start()
+    profiler = SamplingProfiler(interval=server.config["PROFILER_INTERVAL"])
+    if server.config["PROFILER"]:
+        profiler.start()
+    encoder = JpegEncoder(
+        max_workers=server.config["ENCODER_THREADS"],
+        depth=server.config["ENCODER_DEPTH"],
     )
 
-    def gen(video, workout):
+    startup.mark("stations")
+
+    def current_station():
+        """Returns the station claimed by the current session."""
+        return stations.get(session.get("station_id"))
+
+    def gen(station, workout, depth=None):
         """Streams and analyzes video contents while overlaying stats info
         Args:
-        video: a VideoStream object.
+        station: a Station object.
         workout: str, a workout name or "None".  
+        depth: int, the frames encoded ahead, the encoder's default if None.
         Returns:
         bytes, the output image data
         """
+        video = station.video
         if workout != "None":
-            # Initiates the Workout object from the workout name
-            workout = WORKOUTS[workout]()
-            workout.setup(redis=redis)
             annotator = Annotator()
 
-            for output in video.update():
-                # Computes pose stats
-                workout.update(output["pose"])
-                output["workout"] = workout
-
-                # Annotates the image and encodes the raw RGB data into JPEG format
-                output["array"] = annotator.annotate(output)
-                img = cv2.cvtColor(output["array"], cv2.COLOR_RGB2BGR)
-                _, buf = cv2.imencode(".jpeg", img)
-                yield (
-                    b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
-                    + buf.tobytes()
-                    + b"\r\n\r\n"
-                )
+            def annotated():
+                for output in video.update():
+                    # Reps are counted in the capture thread by the station's workout
+                    output["workout"] = station.workout
+                    if output["workout"] is None:
+                        break
+                    if server.config["THERMAL_GOVERNOR"]:
+                        output["thermal"] = governor.status()
+                    output["array"] = annotator.annotate(output)
+                    yield output
+
+            # Encodes the annotated RGB data into JPEG format on the encoder pool
+            for seq, jpeg in encoder.map(
+                lambda output: (
+                    output["seq"],
+                    encode_jpeg(output["array"], quality=governor.jpeg_quality),
+                ),
+                annotated(),
+                depth=depth,
+            ):
+                station.frames.put("annotated", seq, jpeg)
+                yield jpeg
         else:
             # Renders a blurring effect while on standby with no workout
-            for output in video.update():
-                img = cv2.blur(output["array"], (32, 32))
-                img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-                ret, buf = cv2.imencode(".jpeg", img)
-                yield (
-                    b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
-                    + buf.tobytes()
-                    + b"\r\n\r\n"
-                )
+            yield from encoder.map(
+                lambda output: encode_jpeg(blur(output["array"]), gray=True),
+                video.update(),
+                depth=depth,
+            )
+
+    def gen_preview(station):
+        """Streams downscaled raw frames at a reduced frame rate, encoded once
+        per source frame for all preview clients of the station."""
+        interval = 1.0 / server.config["PREVIEW_FPS"]
+        scale = server.config["PREVIEW_SCALE"]
+        next_time = 0.0
+
+        def encode(array):
+            return encode_jpeg(downscale(array, scale))
+
+        for output in station.video.update():
+            now = time.monotonic()
+            if now < next_time:
+                continue
+            next_time = max(next_time + interval, now)
+            yield station.frames.get(
+                "preview",
+                output["seq"],
+                lambda: encoder.submit(encode, output["array"]),
+            )
 
     @app.callback(
-        [Output("videostream", "src"), Output("workout_name", "children")],
+        [
+            Output("videostream", "src"),
+            Output("workout_name", "children"),
+            Output("videostream-ws", "children"),
+        ],
         [Input("workout-dropdown", "value")],
     )
     def start_workout(workout):
+        station = current_station()
         if workout is not None:
             if workout == "random":
                 workout = random.choice(list(WORKOUTS))
-            workout_name = WORKOUTS[workout].name
+            workout_name = station.start_workout(
+                workout,
+                counter=server.config["REP_COUNTER"],
+                peak_window=server.config["PEAK_WINDOW"],
+                multi_person=server.config["MULTI_PERSON"],
+                history_points=server.config["HISTORY_POINTS"],
+            ).name
             session["workout"] = workout_name
         else:
             workout_name = "Select a workout to get started."
             session["workout"] = None
-        logger.info(f'Current workout: {session.get("workout")}')
-        return f"/videostream/{workout}", workout_name
+        logger.info(f'Current workout on {station}: {session.get("workout")}')
+        if transport == "websocket":
+            return None, workout_name, f"/ws/videostream/{station.id}/{workout}"
+        return f"/videostream/{station.id}/{workout}", workout_name, None
 
     @app.callback(
         Output("workout-dropdown", "value"),
@@ -144,18 +255,29 @@ def create_app(config_name):
         [State("workout-dropdown", "value")],
     )
     def stop_workout(n_clicks, workout):
-        if workout is not None:
-            ws = WorkoutSession(
-                user_name=session.get("user_name"),
-                workout=session.get("workout"),
-                reps=redis.get("reps"),
-                pace=redis.get("pace"),
-            )
-            db.session.add(ws)
-            db.session.commit()
-            logger.info(f"{ws} inserted into db")
+        station = current_station()
+        stopped = station.stop_workout() if workout is not None else None
+        if stopped is not None:
+            user_name = session.get("user_name")
+            for person_id, person in stopped.people():
+                state = person.redis.hgetall("session")
+                if person_id is not None and not state.get("reps"):
+                    continue
+                writer.put(
+                    user_name=user_name
+                    if person_id is None
+                    else f"{user_name} #{person_id}",
+                    workout=session.get("workout"),
+                    reps=state.get("reps", 0),
+                    pace=state.get("pace", 0),
+                    form_stats=person.form_summary(),
+                    rep_events=person.rep_events,
+                    **person.form_metrics(),
+                )
         return None
 
+    writer = SessionWriter(server, db, on_commit=bump_version).start()
+
     @app.callback(
         Output("leaderboard-graph", "figure"),
         [Input("update-leaderboard-btn", "n_clicks")],
@@ -163,75 +285,10 @@ def create_app(config_name):
     )
     def update_leaderboard_graph(n_clicks, workout):
         if n_clicks > 0:
-            current_time = datetime.datetime.utcnow()
-            a_week_ago = current_time - datetime.timedelta(weeks=1)
-
-            query = (
-                db.session.query(
-                    WorkoutSession.user_name,
-                    WorkoutSession.workout,
-                    db.func.sum(WorkoutSession.reps).label("reps"),
-                )
-                .filter(WorkoutSession.created_date >= a_week_ago)
-                .group_by(WorkoutSession.user_name, WorkoutSession.workout)
-                .order_by(db.func.sum(WorkoutSession.reps).desc())
-                .all()
-            )
-
-            df = pd.DataFrame(query, columns=["user_name", "workout", "reps"])
-            layout = {
-                "barmode": "stack",
-                "margin": {"l": 0, "r": 0, "b": 0, "t": 40},
-                "autosize": True,
-                "font": {"family": "Comfortaa", "color": COLORS["text"], "size": 10},
-                "plot_bgcolor": COLORS["graph_bg"],
-                "paper_bgcolor": COLORS["graph_bg"],
-                "xaxis": {
-                    "ticks": "",
-                    "showgrid": False,
-                    "title": "",
-                    "automargin": True,
-                    "zeroline": False,
-                },
-                "yaxis": {
-                    "showgrid": False,
-                    "title": "",
-                    "automargin": True,
-                    "categoryorder": "total ascending",
-                    "linewidth": 1,
-                    "linecolor": "#282828",
-                    "zeroline": False,
-                },
-                "title": {
-                    "text": "Last 7 Days",
-                    "y": 0.9,
-                    "x": 0.5,
-                    "xanchor": "center",
-                    "yanchor": "top",
-                },
-                "legend": {
-                    "x": 1.0,
-                    "y": -0.2,
-                    "xanchor": "right",
-                    "yanchor": "top",
-                    "title": "",
-                    "orientation": "h",
-                    "itemclick": "toggle",
-                    "itemdoubleclick": "toggleothers",
-                },
-                "showlegend": True,
-            }
-            fig = px.bar(
-                df,
-                x="reps",
-                y="user_name",
-                color="workout",
-                orientation="h",
-                color_discrete_sequence=px.colors.qualitative.Plotly,
-            )
-            fig.update_layout(layout)
-            fig.update_traces(marker_line_width=0, width=0.5)
-            return fig
+            # Today and the six days before, in whole UTC days
+            today = datetime.datetime.utcnow().date()
+            a_week_ago = today - datetime.timedelta(days=6)
+            return leaderboard_figure(a_week_ago, version())
         else:
             return {
                 "data": [],
@@ -253,12 +310,91 @@ def create_app(config_name):
                 },
             }
 
-    @server.route("/videostream/<workout>", methods=["GET"])
-    def videiostream(workout):
-        user_name = session.get("user_name")
-        logger.info(f"Current player: {user_name}")
+    @server.route("/videostream/<station_id>/<workout>", methods=["GET"])
+    def videiostream(station_id, workout):
+        if station_id not in stations:
+            return Response(f"Unknown station {station_id}", status=404)
+        station = stations[station_id]
+        if not limiter.acquire():
+            return Response(
+                "Too many streams", status=503, headers={"Retry-After": "5"}
+            )
+        logger.info(f"Current player on {station}: {station.user_name}")
+        return Response(
+            limiter.stream(multipart(gen(station, workout)), f"{station} {workout}"),
+            mimetype="multipart/x-mixed-replace; boundary=frame",
+        )
+
+    @server.route("/ws/videostream/<station_id>/<workout>", methods=["GET"])
+    def videostream_ws(station_id, workout):
+        """Sends frames as binary WebSocket messages, the newest one each time
+        the client acknowledges the previous one."""
+        ws = request.environ.get("wsgi.websocket")
+        if ws is None:
+            return Response("Expected a WebSocket upgrade", status=400)
+        if station_id not in stations:
+            ws.close()
+            return Response(f"Unknown station {station_id}", status=404)
+        station = stations[station_id]
+        if not limiter.acquire():
+            ws.close()
+            return Response("Too many streams", status=503)
+        # No frames encoded ahead, each is pulled once the previous one is acked
+        body = limiter.stream(gen(station, workout, depth=0), f"{station} {workout} ws")
+        try:
+            round_trips = send_acked(ws, body, server.config["WS_ACK_TIMEOUT"])
+        finally:
+            body.close()
+            ws.close()
+        if round_trips:
+            logger.info(
+                f"{station} sent {len(round_trips)} frames over WebSocket, mean "
+                f"ack {1000 * sum(round_trips) / len(round_trips):.0f}ms"
+            )
+        return Response()
+
+    def requested_station():
+        """Returns the running station asked for by ?station=, the session's
+        station otherwise, or None."""
+        station_id = request.args.get("station", session.get("station_id"))
+        if station_id is not None and station_id not in stations:
+            return None
+        station = stations.get(station_id)
+        return station if station.running else None
+
+    @server.route("/snapshot.jpg", methods=["GET"])
+    def snapshot():
+        station = requested_station()
+        if station is None:
+            return Response("Station is not running", status=503)
+        frame = station.video.stream.frame
+        if frame is None:
+            return Response("No frame captured yet", status=503)
+
+        # Prefers the annotated frame a viewer has encoded within the last second
+        annotated = station.frames.latest("annotated")
+        if annotated is not None and annotated[0] >= frame["seq"] - FRAMERATE:
+            jpeg = annotated[1]
+        else:
+            jpeg = station.frames.get(
+                "raw", frame["seq"], lambda: encoder.submit(encode_jpeg, frame["array"])
+            )
+        return Response(
+            jpeg, mimetype="image/jpeg", headers={"Cache-Control": "no-cache"}
+        )
+
+    @server.route("/preview", methods=["GET"])
+    def preview():
+        station = requested_station()
+        if station is None:
+            return Response("Station is not running", status=503)
+        if not limiter.acquire():
+            return Response(
+                "Too many streams", status=503, headers={"Retry-After": "5"}
+            )
         return Response(
-            gen(video, workout), mimetype="multipart/x-mixed-replace; boundary=frame"
+            limiter.stream(multipart(gen_preview(station)), f"{station} preview"),
+            mimetype="multipart/x-mixed-replace; boundary=frame",
         )
 
     @app.callback(
@@ -270,36 +406,201 @@ def create_app(config_name):
         [Input("live-update-interval", "n_intervals")],
     )
     def update_workout_graph(n_intervals):
-        inference_time = redis.lpop("inference_time")
-        pose_score = redis.lpop("pose_score")
+        state, (inference_time, pose_score) = current_station().redis.snapshot(
+            "session", pop=("inference_time", "pose_score")
+        )
         data = [{"y": [[inference_time], [pose_score]]}, [0, 1], 200]
 
-        reps = redis.get("reps")
-        pace = redis.get("pace")
+        reps = state.get("reps", 0)
+        pace = state.get("pace", 0)
 
         return data, f"{reps:.0f}", f"{pace*30:.1f}" if pace > 0 else "/"
 
+    @app.callback(
+        Output("history-graph", "figure"),
+        [Input("history-update-interval", "n_intervals")],
+    )
+    def update_history_graph(n_intervals):
+        """Redraws the whole session, downsampled to a fixed number of points."""
+        history = current_station().history
+        return history_figure(history.points() if history is not None else {})
+
+    @server.route("/export", methods=["GET"])
+    def export():
+        """Streams workout history as CSV or Parquet.
+        Query args:
+          table: "sessions" (default) or "reps".
+          format: "csv" (default) or "parquet".
+          start, end: ISO dates, inclusive, on the session's created date.
+          user: a player name.
+        """
+        table = request.args.get("table", "sessions")
+        fmt = request.args.get("format", "csv")
+        if fmt not in FORMATS or table not in ("sessions", "reps"):
+            return Response(f"Unsupported export {table}.{fmt}", status=400)
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                return Response("Parquet export requires pyarrow", status=501)
+        try:
+            start, end = (
+                datetime.datetime.fromisoformat(request.args[k])
+                if request.args.get(k)
+                else None
+                for k in ("start", "end")
+            )
+        except ValueError as e:
+            return Response(f"Invalid date: {e}", status=400)
+        user_name = request.args.get("user")
+
+        if table == "sessions":
+            columns = list(WorkoutSession.__table__.columns)
+        else:
+            columns = list(RepEvent.__table__.columns) + [
+                WorkoutSession.user_name,
+                WorkoutSession.workout,
+            ]
+        query = db.session.query(*columns)
+        if table == "reps":
+            query = query.join(WorkoutSession, RepEvent.session_id == WorkoutSession.id)
+        if start:
+            query = query.filter(WorkoutSession.created_date >= start)
+        if end:
+            end += datetime.timedelta(days=1)
+            query = query.filter(WorkoutSession.created_date < end)
+        if user_name:
+            query = query.filter(WorkoutSession.user_name == user_name)
+        # A server-side cursor fetching a thousand rows at a time
+        query = query.order_by(columns[0]).yield_per(1000)
+
+        mimetype, encode = FORMATS[fmt]
+        filename = f"{table}.{fmt}"
+        # Fails here rather than in a truncated file, e.g. on a schema error
+        chunks = encode(query, [(c.name, c.type) for c in columns])
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+
+    @server.route("/ready", methods=["GET"])
+    def ready():
+        """Reports whether the app can serve workouts, 503 until it can."""
+        checks = {"model": model.status()}
+
+        try:
+            checks["redis"] = {"ready": bool(redis.ping())}
+        except Exception as e:
+            checks["redis"] = {"ready": False, "error": str(e)}
+
+        try:
+            db.session.execute(db.text("SELECT 1"))
+            checks["db"] = {"ready": True}
+        except Exception as e:
+            db.session.rollback()
+            checks["db"] = {"ready": False, "error": str(e)}
+
+        # Cameras only record while a player is logged in, they don't gate
+        now = time.monotonic()
+        checks["cameras"] = {
+            station.id: {
+                "running": station.running,
+                "frames": station.video.stream.seq if station.running else 0,
+                "frame_age_ms": 1000 * (now - station.video.stream.last_capture)
+                if station.running
+                else None,
+                "stalls": station.redis.hgetall("metrics")
+                if checks["redis"]["ready"]
+                else None,
+            }
+            for station in stations
+        }
+        checks["thermal"] = governor.status()
+        checks["startup_ms"] = 1000 * startup.total
+
+        is_ready = all(checks[k]["ready"] for k in ("model", "redis", "db"))
+        checks["ready"] = is_ready
+        return jsonify(checks), 200 if is_ready else 503
+
+    def admin_only(view):
+        """Serves a route only to requests bearing the ADMIN_TOKEN, as a
+        bearer token or a ?token= parameter, and hides it when none is set."""
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            token = server.config["ADMIN_TOKEN"]
+            if not token:
+                return Response("Not Found", status=404)
+            auth = request.headers.get("Authorization", "")
+            given = auth[len("Bearer ") :] if auth.startswith("Bearer ") else None
+            given = given or request.args.get("token", "")
+            if not hmac.compare_digest(given.encode(), token.encode()):
+                return Response("Forbidden", status=403)
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    @server.route("/admin/profile", methods=["GET"])
+    @admin_only
+    def admin_profile():
+        """Dumps the sampled stacks in collapsed format, ready for
+        flamegraph.pl or speedscope. ?reset=true starts a new profile."""
+        if not profiler.running:
+            return Response("The profiler is off, set PROFILER=true", status=404)
+        reset = request.args.get("reset", "false").lower() == "true"
+        samples = profiler.samples
+        return Response(
+            profiler.collapsed(reset=reset),
+            mimetype="text/plain",
+            headers={"X-Profile-Samples": str(samples)},
+        )
+
+    @server.cli.command("allocations")
+    @click.option("--frames", default=50, help="Number of frames to run.")
+    @click.option("--workout", default="jumping_jacks", type=click.Choice(WORKOUTS))
+    @click.option("--image", type=click.Path(exists=True), help="A still frame.")
+    @click.option("--budget", type=float, help="Max total peak KB per frame.")
+    def allocations(frames, workout, image, budget):
+        """Reports the memory allocated per frame by each pipeline stage,
+        running them on a still image, a black frame by default."""
+        import numpy as np
+        from PIL import Image
+        from .allocations import run_pipeline
+
+        if image is None:
+            array = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+        else:
+            array = np.array(Image.open(image).convert("RGB").resize((WIDTH, HEIGHT)))
+        report = run_pipeline(model.get(), array, workout=workout, frames=frames)
+        click.echo(report.format())
+
+        if budget is not None and report.peak > budget:
+            raise click.ClickException(
+                f"{report.peak:.1f}KB peak per frame is over the {budget:.1f}KB budget"
+            )
+
     @server.route("/user_login", methods=["POST"])
     def user_login():
         user_name = request.form.get("user_name_form")
+        station = stations.get(request.form.get("station_form"))
         session["user_name"] = user_name
-        logger.info(f"Player {user_name} logged in")
+        session["station_id"] = station.id
+        logger.info(f"Player {user_name} logged in at {station}")
 
-        if video.closed is None or video.closed:
-            video.setup(model=model, redis=redis)
-            video.start()
+        station.start(user_name)
 
         return redirect("/home")
 
     @server.route("/user_logout")
     def user_logout():
-        user_name = session.pop("user_name")
+        station = current_station()
+        user_name = session.pop("user_name", None)
         if user_name is not None:
             session.clear()
-        logger.info(f"Player {user_name} logged out")
+        logger.info(f"Player {user_name} logged out of {station}")
 
-        if not video.closed:
-            video.close()
+        station.close()
 
         return redirect("/")
 
@@ -309,6 +610,9 @@ def create_app(config_name):
             current_user = session.get("user_name")
             return layout_homepage(current_user)
         else:
-            return layout_login()
+            return layout_login(stations.ids)
+
+    startup.mark("routes and callbacks")
+    logger.info(f"Startup timings:\n{startup.report()}")
 
     return app
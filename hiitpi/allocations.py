@@ -0,0 +1,111 @@
+import collections
+import tracemalloc
+import numpy as np
+from .annotation import Annotator
+from .frames import encode_jpeg
+from .redisclient import RedisClient
+from .workout import WORKOUTS
+
+
+class AllocationReport(object):
+    """Attributes the memory allocated per frame to each pipeline stage.
+
+    tracemalloc's counters are process-wide, so stages must run one after the
+    other on a single thread: the traces are cleared before each stage. The
+    peak of a stage is the most memory it held at once, its transient working
+    set, and what it retained is still referenced once it returned, e.g. the
+    arrays and Pose objects handed over to the next stage.
+    """
+
+    def __init__(self):
+        self.frames = 0
+        self._totals = collections.OrderedDict()
+
+    def start(self):
+        tracemalloc.start()
+        return self
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def measure(self, stage, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) as a stage and returns its result."""
+        tracemalloc.clear_traces()
+        result = fn(*args, **kwargs)
+        retained, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+        totals = self._totals.setdefault(stage, [0, 0, 0])
+        totals[0] += peak
+        totals[1] += retained
+        totals[2] += blocks
+        return result
+
+    def rows(self):
+        """Returns (stage, peak KB, retained KB, retained blocks) per frame."""
+        n = max(self.frames, 1)
+        return [
+            (stage, peak / 1024 / n, retained / 1024 / n, blocks / n)
+            for stage, (peak, retained, blocks) in self._totals.items()
+        ]
+
+    @property
+    def peak(self):
+        """The sum of the stages' peaks per frame, in KB."""
+        return sum(row[1] for row in self.rows())
+
+    def format(self):
+        lines = [
+            f"{self.frames} frames, per frame:",
+            f'{"stage":<20}{"peak KB":>12}{"retained KB":>14}{"blocks":>10}',
+        ]
+        for stage, peak, retained, blocks in self.rows():
+            lines.append(f"{stage:<20}{peak:>12.1f}{retained:>14.1f}{blocks:>10.0f}")
+        lines.append(f'{"total":<20}{self.peak:>12.1f}')
+        return "\n".join(lines)
+
+
+def run_pipeline(model, image, workout="jumping_jacks", frames=50):
+    """Runs the per-frame pipeline on a still image, measuring each stage.
+    Args:
+      model: PoseEngine.
+      image: numpy array, an RGB frame at the camera resolution.
+      workout: str, a key of WORKOUTS.
+      frames: int, the number of frames to run.
+    Returns:
+      AllocationReport.
+    """
+    workout = WORKOUTS[workout]()
+    workout.setup(redis=RedisClient(None, None, None, backend="memory"))
+    annotator = Annotator()
+
+    def analyze():
+        # A new array per frame, like the camera's
+        array = np.array(image)
+        return array, model.InferImage(array)
+
+    report = AllocationReport().start()
+    try:
+        for _ in range(frames):
+            array, output = report.measure("analyze", analyze)
+            poses, inference_time = report.measure(
+                "ParseOutput", model.ParseOutput, output
+            )
+            report.measure("Workout.update", workout.update_poses, poses)
+            pose = max(poses, key=lambda pose: pose.score) if poses else None
+            annotated = report.measure(
+                "Annotator.annotate",
+                annotator.annotate,
+                {
+                    "array": array,
+                    "pose": pose,
+                    "poses": poses,
+                    "inference_time": inference_time,
+                    "workout": workout,
+                },
+            )
+            report.measure("encode", encode_jpeg, annotated)
+            report.frames += 1
+    finally:
+        report.stop()
+    return report
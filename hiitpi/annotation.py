@@ -1,18 +1,11 @@
-import sys
+import re
 import time
 import logging
 import collections
 import numpy as np
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
 
 
-logging.basicConfig(
-    stream=sys.stdout,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt=" %I:%M:%S ",
-    level="INFO",
-)
-
 logger = logging.getLogger(__name__)
 
 EDGES = (
@@ -38,12 +31,124 @@ EDGES = (
 )
 
 
+class TextRenderer(object):
+    """Renders shadowed text straight into an RGB array.
+
+    Glyphs are rasterized once into an atlas of alpha masks. The static runs
+    of a line, e.g. its labels and units, are composed from them once and
+    kept as pre-blended patches, while the numbers, which change every
+    frame, are drawn glyph by glyph from pre-blended glyph patches. Per
+    frame, only the pixels under the text are alpha-blended.
+    """
+
+    # Splits a line into static runs and, at odd indices, numbers
+    NUMBERS = re.compile(r"([0-9.]+)")
+
+    def __init__(self, fill=(211, 211, 211), shadow=(0, 0, 0), spacing=4):
+        """
+        Args:
+          fill: tuple, the RGB color of the text.
+          shadow: tuple, the RGB color of the 1px drop shadow.
+          spacing: int, the number of pixels between lines.
+        """
+        self.font = ImageFont.load_default()
+        self.fill = np.array(fill, dtype=np.float32)
+        self.shadow = np.array(shadow, dtype=np.float32)
+        # Glyphs are tall enough for descenders, lines advance like ImageDraw's
+        self.height = self._height("Ag|")
+        self.line_step = self._height("A") + spacing
+        self._glyphs = {}
+        self._glyph_patches = {}
+        self._runs = collections.OrderedDict()
+        self._max_runs = 256
+
+    def _height(self, text):
+        if hasattr(self.font, "getbbox"):
+            return self.font.getbbox(text)[3]
+        return self.font.getsize(text)[1]
+
+    def _advance(self, char):
+        if hasattr(self.font, "getlength"):
+            return int(round(self.font.getlength(char)))
+        return self.font.getsize(char)[0]
+
+    def glyph(self, char):
+        """Returns the (height, advance) float alpha mask of a character."""
+        if char not in self._glyphs:
+            img = Image.new("L", (max(self._advance(char), 1), self.height))
+            ImageDraw.Draw(img).text((0, 0), char, fill=255, font=self.font)
+            self._glyphs[char] = np.asarray(img, dtype=np.float32) / 255
+        return self._glyphs[char]
+
+    def patch(self, mask):
+        """Composites an alpha mask over its shadow, returns the premultiplied
+        RGB and 1 - alpha, both one pixel larger than the mask."""
+        h, w = mask.shape
+        text_alpha = np.zeros((h + 1, w + 1), dtype=np.float32)
+        shadow_alpha = np.zeros_like(text_alpha)
+        text_alpha[:h, :w] = mask
+        shadow_alpha[1:, 1:] = mask
+
+        shadow_alpha *= 1 - text_alpha
+        rgb = (
+            text_alpha[..., None] * self.fill + shadow_alpha[..., None] * self.shadow
+        )
+        return rgb, (1 - text_alpha - shadow_alpha)[..., None]
+
+    def glyph_patch(self, char):
+        """Returns the pre-blended patch of a single character."""
+        if char not in self._glyph_patches:
+            self._glyph_patches[char] = self.patch(self.glyph(char))
+        return self._glyph_patches[char]
+
+    def run(self, text):
+        """Returns the pre-blended patch of a static run of text."""
+        patch = self._runs.get(text)
+        if patch is not None:
+            self._runs.move_to_end(text)
+            return patch
+
+        patch = self._runs[text] = self.patch(
+            np.hstack([self.glyph(c) for c in text])
+        )
+        if len(self._runs) > self._max_runs:
+            self._runs.popitem(last=False)
+        return patch
+
+    def blend(self, array, x, y, patch):
+        """Blends a patch onto the array at (x, y), returns its advance."""
+        rgb, transparency = patch
+        y0, x0 = max(y, 0), max(x, 0)
+        y1 = min(y + rgb.shape[0], array.shape[0])
+        x1 = min(x + rgb.shape[1], array.shape[1])
+        if y0 < y1 and x0 < x1:
+            src = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+            region = array[y0:y1, x0:x1]
+            region[...] = rgb[src] + region * transparency[src]
+        return rgb.shape[1] - 1
+
+    def draw(self, array, x, y, text):
+        """Blends multi-line text onto an (h, w, 3) uint8 array in place."""
+        for i, line in enumerate(text.split("\n")):
+            top = y + i * self.line_step
+            left = x
+            for j, run in enumerate(self.NUMBERS.split(line)):
+                if not run:
+                    continue
+                if j % 2:
+                    for char in run:
+                        left += self.blend(array, left, top, self.glyph_patch(char))
+                else:
+                    left += self.blend(array, left, top, self.run(run))
+
+
 class Annotator(object):
     """Annotates video streaming output with a drawing overlay."""
 
     def __init__(self):
         self._init_time = time.perf_counter()
         self._rendering_time = collections.deque([self._init_time], maxlen=30)
+        self.text = TextRenderer()
 
     def annotate(self, output):
         self._rendering_time.append(time.perf_counter())
@@ -54,7 +159,18 @@ class Annotator(object):
         img = Image.fromarray(output["array"])
         draw = ImageDraw.Draw(img, "RGBA")
 
-        self.draw_pose(draw, output["pose"])
+        labels = []
+        workout = output["workout"]
+        tracked = getattr(workout, "tracked", None)
+        if tracked is None:
+            self.draw_pose(draw, output["pose"])
+        else:
+            # Labels every tracked person with their ID and reps
+            for person_id, pose in tracked.items():
+                self.draw_pose(draw, pose)
+                x, y = pose.features.xy[pose.features.index["nose"]]
+                reps = workout.workouts[person_id].reps
+                labels.append((x, y - 24, f"#{person_id}: {reps}"))
 
         text_lines = [
             f'Inference time: {output["inference_time"]:.1f}ms ({1000 / output["inference_time"]:.1f}fps)'
@@ -62,17 +178,22 @@ class Annotator(object):
             "",
         ]
 
-        workout = output["workout"]
+        thermal = output.get("thermal")
+        if thermal is not None and thermal["temp"] is not None:
+            text_lines.extend([f'CPU: {thermal["temp"]:.0f}C, {thermal["level"]}', ""])
+
         if workout.stats is not None:
             text_lines.extend([f"{k}: {v:.1f}" for k, v in workout.stats.items()])
 
-        self.draw_text(draw, 10, 10, text="\n".join(text_lines))
+        array = np.array(img)
+        for x, y, label in labels:
+            self.draw_text(array, x, y, text=label)
+        self.draw_text(array, 10, 10, text="\n".join(text_lines))
 
-        return np.asarray(img)
+        return array
 
-    def draw_text(self, draw, x, y, text):
-        draw.text(xy=(x + 1, y + 1), text=text, fill="black")
-        draw.text(xy=(x, y), text=text, fill="lightgray")
+    def draw_text(self, array, x, y, text):
+        self.text.draw(array, int(x), int(y), text)
 
     def draw_circle(self, draw, x, y, r, width, alpha):
         draw.ellipse(
@@ -85,22 +206,16 @@ class Annotator(object):
     def draw_line(self, draw, xy):
         draw.line(xy, fill="yellow", width=2)
 
-    def draw_pose(self, draw, pose, threshold=0.2):
+    def draw_pose(self, draw, pose):
         if pose:
-            xys = {}
-            for label, keypoint in pose.keypoints.items():
-                if keypoint.score < threshold:
-                    continue
-
-                y = int(keypoint.yx[0])
-                x = int(keypoint.yx[1])
-
-                xys[label] = (x, y)
-                self.draw_circle(draw, x, y, r=3, width=1, alpha=keypoint.score)
+            f = pose.features
+            visible = f.mask
+            for i in np.flatnonzero(visible):
+                x, y = f.xy[i]
+                self.draw_circle(draw, x, y, r=3, width=1, alpha=f.scores[i])
 
             for a, b in EDGES:
-                if a not in xys or b not in xys:
+                ia, ib = f.index[a], f.index[b]
+                if not (visible[ia] and visible[ib]):
                     continue
-                ax, ay = xys[a]
-                bx, by = xys[b]
-                self.draw_line(draw, [(ax, ay), (bx, by)])
+                self.draw_line(draw, [tuple(f.xy[ia]), tuple(f.xy[ib])])
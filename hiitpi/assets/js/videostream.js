@@ -0,0 +1,69 @@
+// WebSocket video transport: shows each binary JPEG frame in #videostream and
+// acks it once decoded, so the server only ever sends the newest frame.
+(function () {
+  var ACK = "ack";
+  var RECONNECT_MS = 1000;
+  var socket = null;
+  var path = "";
+  var objectUrl = null;
+
+  function disconnect() {
+    if (socket !== null) {
+      socket.onclose = null;
+      socket.close();
+      socket = null;
+    }
+  }
+
+  function connect() {
+    disconnect();
+    if (!path) {
+      return;
+    }
+    var scheme = window.location.protocol === "https:" ? "wss://" : "ws://";
+    var ws = new WebSocket(scheme + window.location.host + path);
+    ws.binaryType = "blob";
+    ws.onmessage = function (event) {
+      var img = document.getElementById("videostream");
+      if (img === null) {
+        return;
+      }
+      var previous = objectUrl;
+      objectUrl = URL.createObjectURL(
+        new Blob([event.data], { type: "image/jpeg" })
+      );
+      img.onload = img.onerror = function () {
+        if (previous !== null) {
+          URL.revokeObjectURL(previous);
+        }
+        if (ws.readyState === WebSocket.OPEN) {
+          ws.send(ACK);
+        }
+      };
+      img.src = objectUrl;
+    };
+    ws.onclose = function () {
+      // The server ends the stream when the workout changes or on a timeout
+      if (socket === ws) {
+        socket = null;
+        setTimeout(function () {
+          if (socket === null && path) {
+            connect();
+          }
+        }, RECONNECT_MS);
+      }
+    };
+    socket = ws;
+  }
+
+  // The stream URL is set by the start_workout callback, Dash re-renders the
+  // hidden #videostream-ws div whenever it changes
+  new MutationObserver(function () {
+    var el = document.getElementById("videostream-ws");
+    var next = el === null ? "" : el.textContent;
+    if (next !== path) {
+      path = next;
+      connect();
+    }
+  }).observe(document.body, { childList: true, subtree: true, characterData: true });
+})();
@@ -1,7 +1,10 @@
-import sys
+import time
 import logging
+import threading
 import picamera
 import picamera.array
+from . import streaming
+from .log import log_every
 
 
 WIDTH, HEIGHT = 640, 480
@@ -10,41 +13,92 @@ HFLIP = True
 ZOOM = (0.0, 0.0, 1.0, 1.0)
 EV = 0
 
-
-logging.basicConfig(
-    stream=sys.stdout,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt=" %I:%M:%S ",
-    level="INFO",
-)
 logger = logging.getLogger(__name__)
 
 
 class StreamOutput(picamera.array.PiRGBAnalysis):
     """Custom streaming output for the PiCamera"""
 
-    def setup(self, model, redis):
+    def setup(self, model, redis, seq=0):
         """
         Args:
-          model: PoseEngine for TensorFlow Lite models.
+          model: ModelLoader of the PoseEngine for TensorFlow Lite models.
           redis: RedisClient.
+          seq: int, the last frame sequence number, when resuming a recording.
         """
+        self.seq = seq
+        self.frame = None
+        self._new_frame = threading.Condition()
         self.array = None
+        self.poses = []
         self.pose = None
         self.inference_time = None
+        self.workout = None
+        self.history = None
+        # Runs the model on one frame out of inference_every, see ThermalGovernor
+        self.inference_every = 1
+        self._captured = 0
         self.model = model
         self.redis = redis
-        self.redis.set("reps", 0)
-        self.redis.set("pace", 0)
+        # Monotonic times watched for stalls, the inference one is None when idle
+        self.last_capture = time.monotonic()
+        self.inference_started = None
+        if seq == 0:
+            self.redis.hset("session", {"reps": 0, "pace": 0})
 
     def analyze(self, array):
         """While recording is in progress, analyzes incoming array data"""
+        self.last_capture = time.monotonic()
+        # Holds frames back until the model is loaded and warm
+        if not self.model.ready:
+            log_every(logger, logging.INFO, "Dropping frames until the model is ready")
+            return
         self.array = array
-        self.pose, self.inference_time = self.model.DetectPosesInImage(self.array)
-        if self.pose:
-            self.pose = max(self.pose, key=lambda pose: pose.score)
-            self.redis.lpush("pose_score", self.pose.score.item(), max_size=5)
-        self.redis.lpush("inference_time", self.inference_time, max_size=5)
+        self._captured += 1
+        # Skipped frames are published with the poses of the last analyzed one
+        if self.inference_time is None or self._captured % self.inference_every == 0:
+            self.inference_started = time.monotonic()
+            poses, self.inference_time = self.model.get().DetectPosesInImage(
+                self.array
+            )
+            self.inference_started = None
+            self.poses = poses
+            self.pose = max(poses, key=lambda pose: pose.score) if poses else None
+            if self.pose:
+                self.redis.lpush("pose_score", self.pose.score.item(), max_size=5)
+            self.redis.lpush("inference_time", self.inference_time, max_size=5)
+
+            # Counts reps once per analyzed frame, however many clients are watching
+            workout = self.workout
+            if workout is not None:
+                workout.update_poses(poses)
+
+            history = self.history
+            if history is not None:
+                history.append(
+                    inference_time=self.inference_time,
+                    pose_score=self.pose.score.item() if self.pose else None,
+                )
+
+        # Publishes a consistent snapshot of this frame's results
+        with self._new_frame:
+            self.seq += 1
+            self.frame = {
+                "seq": self.seq,
+                "array": self.array,
+                "poses": self.poses,
+                "pose": self.pose,
+                "inference_time": self.inference_time,
+            }
+            self._new_frame.notify_all()
+
+    def wait(self, seq, timeout=None):
+        """Blocks until a frame newer than seq has been analyzed.
+        Returns:
+          int, the sequence number of the latest frame.
+        """
+        streaming.wait_for(self._new_frame, lambda: self.seq > seq, timeout)
+        return self.seq
 
 
 class VideoStream(object):
@@ -55,6 +109,7 @@ class VideoStream(object):
         hflip=HFLIP,
         zoom=ZOOM,
         ev=EV,
+        camera_num=0,
     ):
         """Creates a VideoStream from picamera for streaming and analyzing incoming data.
         Args:
@@ -63,6 +118,7 @@ class VideoStream(object):
           hflip: flip view horizontally.
           zoom: the zoom applied to the camera’s input.
           ev: the exposure compensation level of the camera.
+          camera_num: int, the camera port to open on multi-camera boards.
         """
         # PiCamera configurations
         self.resolution = resolution
@@ -70,22 +126,24 @@ class VideoStream(object):
         self.hflip = hflip
         self.zoom = zoom
         self.ev = ev
+        self.camera_num = camera_num
         logger.info(
-            f"PiCamera configurations: "
+            f"PiCamera configurations: camera_num={self.camera_num}, "
             f"resolution={self.resolution}, framerate={self.framerate}, "
             f"hflip={self.hflip}, zoom={self.zoom}, ev={self.ev}"
         )
         self.closed = None
 
-    def setup(self, model, redis):
+    def setup(self, model, redis, seq=0):
         """Initiates a PiCamera, attaches a StreamOutput and starts recording.
         Args:
-          model: PoseEngine for TensorFlow Lite models.
+          model: ModelLoader of the PoseEngine for TensorFlow Lite models.
           redis: RedisClient.
+          seq: int, the last frame sequence number, when resuming a recording.
         """
 
         # Builds and sets up a PiCamera
-        self.camera = picamera.PiCamera()
+        self.camera = picamera.PiCamera(camera_num=self.camera_num)
         self.camera.resolution = self.resolution
         self.camera.framerate = self.framerate
         self.camera.hflip = self.hflip
@@ -94,7 +152,7 @@ class VideoStream(object):
 
         # Creates and sets up a StreamOutput
         self.stream = StreamOutput(self.camera)
-        self.stream.setup(model=model, redis=redis)
+        self.stream.setup(model=model, redis=redis, seq=seq)
 
         self.closed = False
 
@@ -113,11 +171,69 @@ class VideoStream(object):
 
         self.closed = True
 
+    def restart(self, workout=None, history=None, timeout=5.0):
+        """Reopens the camera with a fresh StreamOutput after a stall, keeping
+        the frame sequence, so open streams carry on.
+        Args:
+          workout: Workout to attach to the new stream, or None.
+          history: SessionHistory to attach to the new stream, or None.
+          timeout: float, the seconds to wait for the stalled camera to close.
+        """
+        stream = self.stream
+        stream.workout = stream.history = None
+
+        # A capture thread stuck in the TPU can keep the camera from closing
+        closer = threading.Thread(
+            target=self._close_camera, args=(self.camera, stream), daemon=True
+        )
+        closer.start()
+        closer.join(timeout)
+        if closer.is_alive():
+            logger.warning("Camera did not close in time, reopening anyway")
+
+        self.setup(model=stream.model, redis=stream.redis, seq=stream.seq)
+        self.set_workout(workout, history)
+        self.start()
+
+    @staticmethod
+    def _close_camera(camera, stream):
+        try:
+            camera.stop_recording()
+        except Exception:
+            logger.exception("Failed to stop recording")
+        finally:
+            camera.close()
+            stream.close()
+
+    def throttle(self, framerate_delta=0, inference_every=1):
+        """Slows down capture and inference, e.g. when the Pi runs hot.
+        Args:
+          framerate_delta: float, added to the capture framerate (fps).
+          inference_every: int, runs the model on one frame out of this many.
+        """
+        if self.closed is not False:
+            return
+        if self.camera.framerate_delta != framerate_delta:
+            self.camera.framerate_delta = framerate_delta
+        self.stream.inference_every = inference_every
+
+    def set_workout(self, workout, history=None):
+        """Attaches a Workout to be updated with every analyzed frame.
+        Args:
+          workout: Workout or None.
+          history: SessionHistory recording the frame metrics, or None.
+        """
+        if self.closed is False:
+            self.stream.workout = workout
+            self.stream.history = history
+
     def update(self):
-        """Streams outputs from the camera."""
+        """Streams outputs from the camera, each analyzed frame once."""
+        seq = 0
         while not self.closed:
-            yield {
-                "array": self.stream.array,
-                "pose": self.stream.pose,
-                "inference_time": self.stream.inference_time,
-            }
+            latest = self.stream.wait(seq, timeout=1.0)
+            if latest == seq:
+                continue
+            frame = dict(self.stream.frame)
+            seq = frame["seq"]
+            yield frame
@@ -14,33 +14,101 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "this is a secret")
 
     MODEL_DIR = os.path.join(BASE_PATH, "assets", "models")
-    MODEL_FILE = os.environ.get("MODEL_FILE")
+    MODEL_FILE = os.environ.get(
+        "MODEL_FILE", "posenet_mobilenet_v1_075_481_641_quant_decoder_edgetpu.tflite"
+    )
     MODEL_PATH = os.path.join(MODEL_DIR, MODEL_FILE)
+    MODEL_WARMUP_RUNS = int(os.environ.get("MODEL_WARMUP_RUNS", 3))
 
     SQLALCHEMY_DATABASE_URI = os.environ.get("SQLALCHEMY_DATABASE_URI")
 
-    CACHE_TYPE = "redis"
+    CACHE_TYPE = os.environ.get("CACHE_TYPE", "RedisCache")
     CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
 
-    SESSION_TYPE = "redis"
+    SESSION_TYPE = os.environ.get("SESSION_TYPE", "redis")
     SESSION_REDIS_URL = os.environ.get("SESSION_REDIS_URL")
-    SESSION_REDIS = redis.from_url(SESSION_REDIS_URL)
+    SESSION_REDIS = redis.from_url(SESSION_REDIS_URL) if SESSION_REDIS_URL else None
 
+    # "redis" for the redis container, "memory" for a zero-network single-node setup
+    REDIS_BACKEND = os.environ.get("REDIS_BACKEND", "redis")
     REDIS_HOST = os.environ.get("REDIS_HOST")
     REDIS_PORT = os.environ.get("REDIS_PORT")
     REDIS_DB = os.environ.get("REDIS_DB")
 
+    # "keystate" thresholds or "peak" detection on a smoothed joint angle signal
+    REP_COUNTER = os.environ.get("REP_COUNTER", "keystate")
+    # Samples averaged by the peak counter, about 0.2s at the camera's framerate
+    PEAK_WINDOW = int(os.environ.get("PEAK_WINDOW", 5))
+
+    # Counts every person in the frame, partners are saved as "<player> #<id>"
+    MULTI_PERSON = os.environ.get("MULTI_PERSON", "false").lower() == "true"
+
+    # "dev" for the threaded Werkzeug server, "gevent" for cooperative streaming
+    SERVER = os.environ.get("SERVER", "dev")
+    HOST = os.environ.get("HOST", "0.0.0.0")
+    PORT = int(os.environ.get("PORT", 8050))
+    MAX_STREAMS = int(os.environ.get("MAX_STREAMS", 8))
+
+    # "mjpeg" for multipart streams, "websocket" for acked frames (gevent only)
+    TRANSPORT = os.environ.get("TRANSPORT", "mjpeg")
+    WS_ACK_TIMEOUT = float(os.environ.get("WS_ACK_TIMEOUT", 10))
+
+    # JPEG encoding threads shared by all streams, and frames in flight per stream
+    ENCODER_THREADS = int(os.environ.get("ENCODER_THREADS", 2))
+    ENCODER_DEPTH = int(os.environ.get("ENCODER_DEPTH", 2))
+
+    # Points of each whole-session history series, downsampled with LTTB
+    HISTORY_POINTS = int(os.environ.get("HISTORY_POINTS", 300))
+
+    # Downscaled /preview stream for secondary displays
+    PREVIEW_SCALE = float(os.environ.get("PREVIEW_SCALE", 0.5))
+    PREVIEW_FPS = float(os.environ.get("PREVIEW_FPS", 5))
+
+    # Reopens a camera or reloads the model when frames or inferences stall
+    WATCHDOG = os.environ.get("WATCHDOG", "true").lower() == "true"
+    WATCHDOG_FRAME_DEADLINE = float(os.environ.get("WATCHDOG_FRAME_DEADLINE", 5))
+    WATCHDOG_INFERENCE_DEADLINE = float(
+        os.environ.get("WATCHDOG_INFERENCE_DEADLINE", 2)
+    )
+
+    # Lowers JPEG quality, inference cadence then framerate as the CPU heats up
+    THERMAL_GOVERNOR = os.environ.get("THERMAL_GOVERNOR", "true").lower() == "true"
+    THERMAL_SYSFS_ROOT = os.environ.get("THERMAL_SYSFS_ROOT", "/sys")
+    THERMAL_THRESHOLDS = tuple(
+        float(t) for t in os.environ.get("THERMAL_THRESHOLDS", "70,75,80").split(",")
+    )
+
+    # Logs are written by a background thread, as text or JSON lines
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")
+
+    # Protects the /admin routes, which are hidden when it isn't set
+    ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+    # Samples every thread's stack for /admin/profile, cheap enough to leave on
+    PROFILER = os.environ.get("PROFILER", "false").lower() == "true"
+    PROFILER_INTERVAL = float(os.environ.get("PROFILER_INTERVAL", 0.01))
+
+    # Comma-separated camera ports, one workout station each
+    STATIONS = [s.strip() for s in os.environ.get("STATIONS", "0").split(",")]
+
 
 class DevelopmentConfig(Config):
     ENV = "development"
     DEBUG = True
     DEVELOPMENT = True
     TEMPLATES_AUTO_RELOAD = True
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "DEBUG").upper()
 
 
 class TestingConfig(Config):
     ENV = "testing"
     TESTING = True
+    CACHE_TYPE = "SimpleCache"
+    SESSION_TYPE = "filesystem"
+    REDIS_BACKEND = "memory"
+    WATCHDOG = False
+    THERMAL_GOVERNOR = False
 
 
 class ProductionConfig(Config):
@@ -0,0 +1,131 @@
+import io
+import csv
+import json
+import itertools
+import sqlalchemy as sa
+
+
+def _plain(value):
+    """Turns JSON columns into strings so rows fit flat file formats."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def iter_csv(rows, columns, chunk_size=64 * 1024):
+    """Encodes rows as CSV in chunks of about chunk_size characters.
+    Args:
+      rows: iterable of tuples, in the order of columns.
+      columns: list of (str, TypeEngine), the column names and SQLAlchemy types.
+      chunk_size: int, the number of characters buffered before yielding.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow([name for name, _ in columns])
+    for row in rows:
+        writer.writerow([_plain(value) for value in row])
+        if buf.tell() >= chunk_size:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+class _ChunkSink(object):
+    """A write-only file object handing written bytes out as chunks, so the
+    Parquet writer can stream without buffering the whole file."""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return b"".join(chunks)
+
+
+def parquet_schema(columns):
+    """Returns the Arrow schema of columns, JSON and any other type without a
+    matching Arrow type being written as strings.
+    Args:
+      columns: list of (str, TypeEngine), the column names and SQLAlchemy types.
+    """
+    import pyarrow as pa
+
+    # Checked in order, DateTime isn't a subclass of Date
+    arrow_types = (
+        (sa.Boolean, pa.bool_()),
+        (sa.Integer, pa.int64()),
+        (sa.Float, pa.float64()),
+        (sa.DateTime, pa.timestamp("us")),
+        (sa.Date, pa.date32()),
+    )
+    return pa.schema(
+        [
+            (
+                name,
+                next(
+                    (t for base, t in arrow_types if isinstance(type_, base)),
+                    pa.string(),
+                ),
+            )
+            for name, type_ in columns
+        ]
+    )
+
+
+def iter_parquet(rows, columns, row_group_size=10000):
+    """Encodes rows as a Parquet file, yielding each row group as written.
+    The schema is built on the call, so its errors come before any byte is
+    streamed.
+    Args:
+      rows: iterable of tuples, in the order of columns.
+      columns: list of (str, TypeEngine), the column names and SQLAlchemy types.
+      row_group_size: int, the number of rows held in memory at a time.
+    Raises:
+      ImportError: pyarrow is not installed.
+    """
+    return _iter_parquet(rows, parquet_schema(columns), row_group_size)
+
+
+def _iter_parquet(rows, schema, row_group_size):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    rows = iter(rows)
+    while True:
+        group = list(itertools.islice(rows, row_group_size))
+        if not group:
+            break
+        arrays = [
+            pa.array([_plain(row[i]) for row in group], type=field.type)
+            for i, field in enumerate(schema)
+        ]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+FORMATS = {
+    "csv": ("text/csv", iter_csv),
+    "parquet": ("application/octet-stream", iter_parquet),
+}
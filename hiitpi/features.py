@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class lazy:
+    """A read-only property computed on first access and then memoized."""
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.func.__name__] = self.func(obj)
+        return value
+
+
+class PoseFeatures:
+    """The geometry of one pose in one frame, shared by the workouts, the
+    annotator and the tracker. Everything is computed on first use only."""
+
+    def __init__(self, pose, threshold=0.2):
+        """
+        Args:
+          pose: Pose.
+          threshold: float, the min score of a visible keypoint.
+        """
+        self.pose = pose
+        self.threshold = threshold
+        self.index = {k: i for i, k in enumerate(pose.keypoints)}
+        self._norms = {}
+        self._angles = {}
+
+    @lazy
+    def yx(self):
+        """(n, 2) float keypoint coordinates."""
+        return np.array([kp.yx for kp in self.pose.keypoints.values()], dtype=float)
+
+    @lazy
+    def scores(self):
+        """(n,) keypoint scores."""
+        return np.array(
+            [kp.score for kp in self.pose.keypoints.values()], dtype=float
+        )
+
+    @lazy
+    def mask(self):
+        """(n,) bool, whether each keypoint scores above the threshold."""
+        return self.scores > self.threshold
+
+    @lazy
+    def xy(self):
+        """(n, 2) integer pixel coordinates, in (x, y) order for drawing."""
+        return self.yx[:, ::-1].astype(int)
+
+    @lazy
+    def centroid(self):
+        """(2,) mean of the visible keypoints, or of all of them if none is."""
+        mask = self.mask if self.mask.any() else slice(None)
+        return self.yx[mask].mean(axis=0)
+
+    @lazy
+    def scale(self):
+        """The body scale, the mean of the visible shoulder-to-hip lengths, used
+        to compare lengths across distances to the camera (NaN if unknown)."""
+        lengths = [
+            self.norm(a, b)
+            for a, b in (("left shoulder", "left hip"), ("right shoulder", "right hip"))
+            if self.visible((a, b))
+        ]
+        return float(np.mean(lengths)) if lengths else float("nan")
+
+    def visible(self, labels):
+        """Whether all of the given keypoints are above the threshold."""
+        return all(self.mask[self.index[k]] for k in labels)
+
+    def norm(self, a, b):
+        """The length of the edge between keypoints a and b."""
+        key = (a, b) if a <= b else (b, a)
+        if key not in self._norms:
+            vec = self.yx[self.index[a]] - self.yx[self.index[b]]
+            self._norms[key] = float(np.hypot(vec[0], vec[1]))
+        return self._norms[key]
+
+    def angle(self, vertex, a, b):
+        """The angle in degrees at keypoint vertex between keypoints a and b."""
+        key = (vertex, a, b) if a <= b else (vertex, b, a)
+        if key not in self._angles:
+            v = self.yx[self.index[vertex]]
+            u, w = self.yx[self.index[a]] - v, self.yx[self.index[b]] - v
+            cosang = u[0] * w[0] + u[1] * w[1]
+            sinang = abs(u[0] * w[1] - u[1] * w[0])
+            self._angles[key] = float(np.degrees(np.arctan2(sinang, cosang)))
+        return self._angles[key]
@@ -0,0 +1,118 @@
+# OpenCV is imported on first use, it is slow to import on a Pi
+import threading
+import collections
+from . import streaming
+
+
+def encode_jpeg(array, gray=False, quality=None):
+    """Encodes an RGB array into JPEG bytes.
+    Args:
+      array: numpy array, the RGB image.
+      gray: bool, whether to encode a grayscale image.
+      quality: int, the JPEG quality (0-100), OpenCV's default if None.
+    """
+    import cv2
+
+    img = cv2.cvtColor(array, cv2.COLOR_RGB2GRAY if gray else cv2.COLOR_RGB2BGR)
+    params = [] if quality is None else [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+    _, buf = cv2.imencode(".jpeg", img, params)
+    return buf.tobytes()
+
+
+def blur(array, ksize=32):
+    """Blurs an image with a box filter."""
+    import cv2
+
+    return cv2.blur(array, (ksize, ksize))
+
+
+def downscale(array, scale):
+    """Shrinks an image by the given factor."""
+    import cv2
+
+    return cv2.resize(array, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def multipart(jpegs):
+    """Wraps JPEG bytes into multipart/x-mixed-replace parts."""
+    for jpeg in jpegs:
+        yield b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n\r\n"
+
+
+class EncodedFrameCache(object):
+    """Keeps the latest encoding of each kind of frame of a station, so any
+    number of clients share a single encode per source frame."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = {}
+
+    def put(self, kind, seq, jpeg):
+        """Stores an already encoded frame unless a newer one is cached."""
+        with self._lock:
+            cached = self._entries.get(kind)
+            if cached is None or cached[0] < seq:
+                self._entries[kind] = (seq, jpeg)
+
+    def latest(self, kind):
+        """Returns the latest (seq, jpeg) of a kind, or None."""
+        return self._entries.get(kind)
+
+    def get(self, kind, seq, encode):
+        """Returns the encoding of frame seq, calling encode() only if no
+        client has encoded or is encoding that frame yet.
+        Args:
+          encode: callable returning a Future of the JPEG bytes, waited on
+            outside of the lock so a stream never blocks the others.
+        """
+        with self._lock:
+            cached = self._entries.get(kind)
+            if cached is not None and cached[0] >= seq:
+                return cached[1]
+            pending = self._pending.get(kind)
+            if pending is None or pending[0] < seq:
+                pending = self._pending[kind] = (seq, encode())
+        jpeg = pending[1].result()
+        self.put(kind, pending[0], jpeg)
+        return jpeg
+
+
+class JpegEncoder(object):
+    """Runs JPEG encoding on a small thread pool, pipelined with the caller.
+
+    OpenCV releases the GIL while encoding, so frame N is encoded on the pool
+    while the caller's generator already annotates frame N+1.
+    """
+
+    def __init__(self, max_workers=2, depth=2):
+        """
+        Args:
+          max_workers: int, the number of encoding threads shared by all streams.
+          depth: int, the max number of frames in flight per stream.
+        """
+        self.depth = depth
+        self._pool = streaming.executor(max_workers, "jpeg-encoder")
+
+    def submit(self, fn, *args):
+        """Runs fn(*args) on the pool, returns its Future."""
+        return self._pool.submit(fn, *args)
+
+    def map(self, fn, items, depth=None):
+        """Like map(fn, items), with fn running on the pool, results in order.
+        At most `depth` items are submitted ahead of the one being yielded,
+        0 pulls each item only once the previous result was consumed.
+        """
+        depth = self.depth if depth is None else depth
+        in_flight = collections.deque()
+        try:
+            for item in items:
+                in_flight.append(self._pool.submit(fn, item))
+                if len(in_flight) > depth:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+        finally:
+            # The client went away, skips whatever hasn't started yet
+            for future in in_flight:
+                future.cancel()
@@ -0,0 +1,149 @@
+import os
+import logging
+import threading
+import collections
+
+
+logger = logging.getLogger(__name__)
+
+TEMP_PATH = "class/thermal/thermal_zone0/temp"
+FREQ_PATH = "devices/system/cpu/cpu0/cpufreq/scaling_cur_freq"
+# The firmware's `vcgencmd get_throttled` flags, as exposed by the kernel
+THROTTLED_PATH = "devices/platform/soc/soc:firmware/get_throttled"
+# Frequency capped, currently throttled, soft temperature limit active
+THROTTLED_NOW = 0x2 | 0x4 | 0x8
+
+# What each thermal level gives up, cheapest first: JPEG quality, then one
+# inference every n frames, then capture framerate
+Level = collections.namedtuple(
+    "Level", ["name", "jpeg_quality", "inference_every", "framerate_delta"]
+)
+LEVELS = (
+    Level("normal", None, 1, 0),
+    Level("warm", 70, 1, 0),
+    Level("hot", 60, 2, -6),
+    Level("critical", 50, 2, -12),
+)
+
+
+class ThermalGovernor(object):
+    """Trades quality for heat before the firmware throttles the Pi.
+
+    Reads the CPU temperature, frequency and throttling flags from sysfs and
+    picks a level from LEVELS: one more for each temperature threshold
+    crossed, and at least "hot" once the firmware throttles anyway. Levels
+    are only stepped down once the temperature is `hysteresis` degrees below
+    the threshold, so they don't flap.
+    """
+
+    def __init__(
+        self, stations, redis, root="/sys", thresholds=(70, 75, 80), hysteresis=3.0
+    ):
+        """
+        Args:
+          stations: StationRegistry, whose cameras and inference are slowed down.
+          redis: RedisClient, the state is kept in its "metrics" hash.
+          root: str, the sysfs mount point, a fake directory in tests.
+          thresholds: tuple of float, the temperatures (C) entering each level
+            above "normal".
+          hysteresis: float, the degrees (C) below a threshold to leave a level.
+        """
+        self.stations = stations
+        self.redis = redis
+        self.root = root
+        self.thresholds = thresholds
+        self.hysteresis = hysteresis
+        self.level = LEVELS[0]
+        self.temp = None
+        self.freq_mhz = None
+        self.throttled = False
+        self._stopped = threading.Event()
+
+    def read(self, path, scale=1, base=10):
+        """Reads a sysfs integer, divided by scale, or None if unavailable."""
+        try:
+            with open(os.path.join(self.root, path)) as f:
+                return int(f.read().strip(), base) / scale
+        except (OSError, ValueError):
+            return None
+
+    def select(self, temp, throttled):
+        """Returns the index in LEVELS for a temperature (C) and throttle state."""
+        current = LEVELS.index(self.level)
+        index = 0
+        if temp is not None:
+            for i, threshold in enumerate(self.thresholds, 1):
+                # Holds the current level until the temperature clearly drops
+                margin = self.hysteresis if i <= current else 0
+                if temp >= threshold - margin:
+                    index = i
+        if throttled:
+            index = max(index, 2)
+        return min(index, len(LEVELS) - 1)
+
+    def update(self):
+        """Reads the sensors, and applies and publishes the resulting level."""
+        self.temp = self.read(TEMP_PATH, scale=1000)
+        self.freq_mhz = self.read(FREQ_PATH, scale=1000)
+        flags = self.read(THROTTLED_PATH, base=16)
+        self.throttled = flags is not None and bool(int(flags) & THROTTLED_NOW)
+
+        level = LEVELS[self.select(self.temp, self.throttled)]
+        if level != self.level:
+            logger.warning(
+                f"Thermal level {self.level.name} -> {level.name} "
+                f"(temp={self.temp}C, freq={self.freq_mhz}MHz)"
+            )
+            self.level = level
+
+        for station in self.stations:
+            station.video.throttle(
+                framerate_delta=level.framerate_delta,
+                inference_every=level.inference_every,
+            )
+        self.redis.hset("metrics", self.metrics())
+
+    def metrics(self):
+        """Returns the flat state kept in the "metrics" hash."""
+        metrics = {
+            "thermal_level": LEVELS.index(self.level),
+            "throttled": int(self.throttled),
+        }
+        if self.temp is not None:
+            metrics["cpu_temp"] = self.temp
+        if self.freq_mhz is not None:
+            metrics["cpu_freq_mhz"] = self.freq_mhz
+        return metrics
+
+    def status(self):
+        return {
+            "level": self.level.name,
+            "temp": self.temp,
+            "freq_mhz": self.freq_mhz,
+            "throttled": self.throttled,
+            "jpeg_quality": self.level.jpeg_quality,
+            "inference_every": self.level.inference_every,
+            "framerate_delta": self.level.framerate_delta,
+        }
+
+    @property
+    def jpeg_quality(self):
+        return self.level.jpeg_quality
+
+    def start(self, interval=2.0):
+        """Updates the level every interval seconds in a background thread."""
+        thread = threading.Thread(
+            target=self._run, args=(interval,), name="thermal-governor", daemon=True
+        )
+        thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self, interval):
+        while not self._stopped.wait(interval):
+            try:
+                self.update()
+            except Exception:
+                logger.exception("Thermal governor failed to update")
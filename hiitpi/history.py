@@ -0,0 +1,109 @@
+import time
+import threading
+import numpy as np
+
+
+def lttb(x, y, n_out):
+    """Downsamples a series with Largest-Triangle-Three-Buckets, keeping the
+    points that preserve its visual shape.
+    Args:
+      x, y: 1-D numpy arrays, the series sorted by x.
+      n_out: int, the number of points to keep, at least 3.
+    Returns:
+      (x, y), the selected points, the first and the last one included.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    every = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        # The third vertex is the average of the next bucket
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return x[selected], y[selected]
+
+
+class HistorySeries(object):
+    """A series of unbounded length kept as coarse LTTB tiles.
+
+    Points are buffered into a raw tile, which is downsampled into
+    `tile_points` coarse points once it holds `tile_size` of them. When the
+    coarse points outgrow twice the budget they are compacted back to the
+    budget, so memory stays bounded and each point costs O(1) amortized.
+    """
+
+    def __init__(self, budget=300, tile_size=240, tile_points=24):
+        """
+        Args:
+          budget: int, the number of points the series is rendered with.
+          tile_size: int, the number of raw points per tile.
+          tile_points: int, the number of points a full tile is reduced to.
+        """
+        self.budget = budget
+        self.tile_size = tile_size
+        self.tile_points = tile_points
+        self.count = 0
+        self._raw_x, self._raw_y = [], []
+        self._x, self._y = np.empty(0), np.empty(0)
+
+    def append(self, x, y):
+        self.count += 1
+        self._raw_x.append(x)
+        self._raw_y.append(y)
+        if len(self._raw_x) < self.tile_size:
+            return
+        tile_x, tile_y = lttb(
+            np.array(self._raw_x), np.array(self._raw_y), self.tile_points
+        )
+        self._raw_x, self._raw_y = [], []
+        self._x = np.concatenate([self._x, tile_x])
+        self._y = np.concatenate([self._y, tile_y])
+        if len(self._x) > 2 * self.budget:
+            self._x, self._y = lttb(self._x, self._y, self.budget)
+
+    def points(self, n_out=None):
+        """Returns the whole series downsampled to n_out points, the budget
+        by default, as (x, y) lists."""
+        x = np.concatenate([self._x, self._raw_x])
+        y = np.concatenate([self._y, self._raw_y])
+        x, y = lttb(x, y, n_out or self.budget)
+        return x.tolist(), y.tolist()
+
+
+class SessionHistory(object):
+    """The whole-session history of a station's live metrics, with x in
+    seconds since the workout started."""
+
+    def __init__(self, names, budget=300):
+        """
+        Args:
+          names: iterable of str, the series recorded.
+          budget: int, the number of points each series is rendered with.
+        """
+        self.start = time.monotonic()
+        self.series = {name: HistorySeries(budget=budget) for name in names}
+        self._lock = threading.Lock()
+
+    def append(self, **values):
+        """Adds a point to each of the given series, skipping None values."""
+        t = time.monotonic() - self.start
+        with self._lock:
+            for name, value in values.items():
+                if value is not None:
+                    self.series[name].append(t, float(value))
+
+    def points(self):
+        """Returns {name: (x, y)} for every series."""
+        with self._lock:
+            return {name: s.points() for name, s in self.series.items()}
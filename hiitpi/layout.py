@@ -1,5 +1,3 @@
-import plotly.express as px
-import plotly.graph_objects as go
 import dash_core_components as dcc
 import dash_html_components as html
 
@@ -9,6 +7,53 @@ from .workout import WORKOUTS
 COLORS = {"graph_bg": "#1E1E1E", "text": "#696969"}
 
 
+def history_figure(series):
+    """The figure of the whole-session history graph.
+    Args:
+      series: dict, {name: (x, y)} as returned by SessionHistory.points().
+    """
+    inference_x, inference_y = series.get("inference_time", ([], []))
+    score_x, score_y = series.get("pose_score", ([], []))
+    return {
+        "data": [
+            {
+                "name": "Inference Time",
+                "type": "scatter",
+                "x": inference_x,
+                "y": inference_y,
+                "mode": "lines",
+                "line": {"color": "#e6af19"},
+            },
+            {
+                "name": "Pose Score",
+                "type": "scatter",
+                "x": score_x,
+                "y": score_y,
+                "yaxis": "y2",
+                "mode": "lines",
+                "line": {"color": "#6145bf"},
+            },
+        ],
+        "layout": {
+            "margin": {"l": 60, "r": 60, "b": 30, "t": 20},
+            "height": 180,
+            "autosize": True,
+            "showlegend": False,
+            "font": {"family": "Comfortaa", "color": COLORS["text"], "size": 10},
+            "plot_bgcolor": COLORS["graph_bg"],
+            "paper_bgcolor": COLORS["graph_bg"],
+            "xaxis": {"title": "Session (s)", "showgrid": False},
+            "yaxis": {"title": "Inference Time (ms)"},
+            "yaxis2": {
+                "range": [0, 1],
+                "title": "Pose Score",
+                "overlaying": "y",
+                "side": "right",
+            },
+        },
+    }
+
+
 def layout_config_panel(current_user):
     """The Dash app layout for the user config panel"""
 
@@ -147,6 +192,18 @@ def layout_config_panel(current_user):
         ]
     )
 
+    # The whole session, downsampled on the server to a fixed number of points
+    history_graph = html.Div(
+        [
+            dcc.Graph(
+                id="history-graph",
+                figure=history_figure({}),
+                config={"displayModeBar": False, "responsive": True},
+            ),
+            dcc.Interval(id="history-update-interval", interval=2000, n_intervals=0),
+        ]
+    )
+
     bars_graph = html.Div(
         [
             html.Button(
@@ -171,6 +228,7 @@ def layout_config_panel(current_user):
             title,
             subtitle,
             live_update_graph,
+            history_graph,
             dropdown_menu,
             workout_name,
             indicators,
@@ -183,7 +241,11 @@ def layout_config_panel(current_user):
 def layout_videostream():
     """The Dash app layout for the video stream"""
     videostream = html.Img(id="videostream")
-    return html.Div([videostream], className="eight columns app__video_image")
+    # Holds the WebSocket URL of the stream, read by assets/js/videostream.js
+    videostream_ws = html.Div(id="videostream-ws", style={"display": "none"})
+    return html.Div(
+        [videostream, videostream_ws], className="eight columns app__video_image"
+    )
 
 
 def layout_homepage(current_user):
@@ -194,7 +256,7 @@ def layout_homepage(current_user):
     )
 
 
-def layout_login():
+def layout_login(station_ids=()):
     """The Dash app login oage layout"""
     header = html.Div(
         [
@@ -215,10 +277,23 @@ def layout_login():
         className="app__header",
     )
 
+    # Lets the player pick a camera when the server drives several stations
+    station_select = []
+    if len(station_ids) > 1:
+        station_select = [
+            html.Select(
+                [html.Option(f"STATION {i}", value=i) for i in station_ids],
+                id="station_select",
+                name="station_form",
+                title="Pick the station you are standing at.",
+            )
+        ]
+
     login_form = html.Div(
         [
             html.Form(
-                [
+                station_select
+                + [
                     dcc.Input(
                         id="user_name_input",
                         name="user_name_form",
@@ -0,0 +1,94 @@
+from . import db, cache, COLORS
+from .model import LeaderboardRollup
+
+
+# Bumped after every commit of workout sessions, so cached figures expire
+VERSION_KEY = "leaderboard_version"
+
+
+def version():
+    """Returns the current leaderboard version."""
+    return cache.get(VERSION_KEY) or 0
+
+
+def bump_version():
+    """Invalidates every cached leaderboard figure."""
+    # Flask-Caching's Cache has no inc(), its backends do, atomically
+    cache.cache.inc(VERSION_KEY)
+
+
+@cache.memoize(timeout=24 * 60 * 60)
+def leaderboard_figure(since, version):
+    """Builds the leaderboard figure over the days from `since` on.
+    Cached per window and per leaderboard version, which the session
+    writer bumps after every commit, see bump_version().
+    """
+    import pandas as pd
+    import plotly.express as px
+
+    query = (
+        db.session.query(
+            LeaderboardRollup.user_name,
+            LeaderboardRollup.workout,
+            db.func.sum(LeaderboardRollup.reps).label("reps"),
+        )
+        .filter(LeaderboardRollup.day >= since)
+        .group_by(LeaderboardRollup.user_name, LeaderboardRollup.workout)
+        .order_by(db.func.sum(LeaderboardRollup.reps).desc())
+        .all()
+    )
+
+    df = pd.DataFrame(query, columns=["user_name", "workout", "reps"])
+    layout = {
+        "barmode": "stack",
+        "margin": {"l": 0, "r": 0, "b": 0, "t": 40},
+        "autosize": True,
+        "font": {"family": "Comfortaa", "color": COLORS["text"], "size": 10},
+        "plot_bgcolor": COLORS["graph_bg"],
+        "paper_bgcolor": COLORS["graph_bg"],
+        "xaxis": {
+            "ticks": "",
+            "showgrid": False,
+            "title": "",
+            "automargin": True,
+            "zeroline": False,
+        },
+        "yaxis": {
+            "showgrid": False,
+            "title": "",
+            "automargin": True,
+            "categoryorder": "total ascending",
+            "linewidth": 1,
+            "linecolor": "#282828",
+            "zeroline": False,
+        },
+        "title": {
+            "text": "Last 7 Days",
+            "y": 0.9,
+            "x": 0.5,
+            "xanchor": "center",
+            "yanchor": "top",
+        },
+        "legend": {
+            "x": 1.0,
+            "y": -0.2,
+            "xanchor": "right",
+            "yanchor": "top",
+            "title": "",
+            "orientation": "h",
+            "itemclick": "toggle",
+            "itemdoubleclick": "toggleothers",
+        },
+        "showlegend": True,
+    }
+    fig = px.bar(
+        df,
+        x="reps",
+        y="user_name",
+        color="workout",
+        orientation="h",
+        color_discrete_sequence=px.colors.qualitative.Plotly,
+    )
+    fig.update_layout(layout)
+    fig.update_traces(marker_line_width=0, width=0.5)
+    return fig.to_dict()
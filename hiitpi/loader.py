@@ -0,0 +1,112 @@
+import time
+import logging
+import threading
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class ModelLoader(object):
+    """Loads the PoseEngine in a background thread and warms it up.
+
+    Importing the Edge TPU runtime and loading the delegate are among the
+    slowest steps of a restart, and the first inference on the TPU takes far
+    longer than the following ones. Both are paid at startup, off the request
+    path, and frames are held back until the model is warm.
+    """
+
+    def __init__(self, model_path, warmup_runs=3):
+        """
+        Args:
+          model_path: str, path to the TF-Lite Flatbuffer file.
+          warmup_runs: int, the number of dummy inferences run after loading.
+        """
+        self.model_path = model_path
+        self.warmup_runs = warmup_runs
+        self.load_time = None
+        self.warmup_times = []
+        self.error = None
+        self.reloads = 0
+        self._model = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    @property
+    def loading(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Starts loading the model in the background, once."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._load, name="model-loader", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def reload(self):
+        """Swaps in a fresh PoseEngine, e.g. after the TPU hung, holding frames
+        back until it is warm. Does nothing while a load is in progress."""
+        with self._lock:
+            if self.loading:
+                return self
+            self._ready.clear()
+            self._model = None
+            self.error = None
+            self.warmup_times = []
+            self.reloads += 1
+            logger.warning(f"Reloading the model ({self.reloads})")
+            self._thread = threading.Thread(
+                target=self._load, name="model-loader", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def _load(self):
+        try:
+            start = time.perf_counter()
+            from .pose import PoseEngine
+
+            model = PoseEngine(model_path=self.model_path)
+            self.load_time = time.perf_counter() - start
+
+            dummy = np.zeros(
+                (model.image_height, model.image_width, model.image_depth),
+                dtype=np.uint8,
+            )
+            for _ in range(self.warmup_runs):
+                start = time.perf_counter()
+                model.DetectPosesInImage(dummy)
+                self.warmup_times.append(time.perf_counter() - start)
+
+            self._model = model
+            self._ready.set()
+            logger.info(
+                f"Model loaded in {1000 * self.load_time:.0f}ms, warm-up inferences: "
+                + ", ".join(f"{1000 * t:.1f}ms" for t in self.warmup_times)
+            )
+        except Exception as e:
+            self.error = e
+            logger.exception("Model failed to load")
+
+    def get(self, timeout=None):
+        """Returns the warm PoseEngine, or None if it isn't ready in time."""
+        self.start()
+        self._ready.wait(timeout)
+        return self._model
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "load_ms": None if self.load_time is None else 1000 * self.load_time,
+            "warmup_ms": [1000 * t for t in self.warmup_times],
+            "error": None if self.error is None else str(self.error),
+            "reloads": self.reloads,
+        }
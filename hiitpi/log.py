@@ -0,0 +1,110 @@
+import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import collections
+import logging.handlers
+
+
+FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+DATEFMT = " %I:%M:%S "
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, for log collectors."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Only merges the message arguments, which may change once the call
+    returns, and leaves the rest of the formatting to the listener thread."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+
+def setup_logging(level="INFO", json_format=False):
+    """Sends every record through a queue to a single stdout handler running
+    on its own thread, so logging from the capture and streaming threads
+    never waits on I/O. Can be called again to change the level or format.
+    Args:
+      level: str, the root logger level.
+      json_format: bool, whether to write JSON lines instead of text.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    handler = logging.StreamHandler(sys.stdout)
+    if json_format:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(FORMAT, DATEFMT))
+    records = queue.Queue()
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [_QueueHandler(records)]
+    root.setLevel(level)
+
+
+@atexit.register
+def _flush():
+    if _listener is not None:
+        _listener.stop()
+
+
+_last = {}
+_suppressed = collections.Counter()
+_lock = threading.Lock()
+
+
+def log_every(logger, level, msg, interval=5.0):
+    """Logs msg at most once every interval seconds from a given call site,
+    for log calls on the per-frame path. The message says how many calls
+    were skipped since the last one.
+    Args:
+      logger: logging.Logger.
+      level: int, e.g. logging.WARNING.
+      msg: str, the message.
+      interval: float, the min seconds between two records.
+    Returns:
+      bool, whether the message was logged.
+    """
+    if not logger.isEnabledFor(level):
+        return False
+    caller = sys._getframe(1)
+    site = (caller.f_code, caller.f_lineno)
+    now = time.monotonic()
+    with _lock:
+        if now - _last.get(site, -interval) < interval:
+            _suppressed[site] += 1
+            return False
+        _last[site] = now
+        skipped = _suppressed.pop(site, 0)
+    if skipped:
+        msg = f"{msg} ({skipped} similar messages skipped)"
+    logger.log(level, msg)
+    return True
@@ -7,11 +7,109 @@ class WorkoutSession(db.Model):
     __tablename__ = "workout_session"
 
     id = db.Column(db.Integer, primary_key=True)
-    created_date = db.Column(db.DateTime(), default=datetime.datetime.utcnow)
+    created_date = db.Column(
+        db.DateTime(), default=datetime.datetime.utcnow, index=True
+    )
     user_name = db.Column(db.String(80), nullable=False)
     workout = db.Column(db.String(80), nullable=False)
     reps = db.Column(db.Integer(), nullable=False)
     pace = db.Column(db.Float(), nullable=False)
+    # Form metrics aggregated over the reps, see Workout.form_metrics()
+    rom_mean = db.Column(db.Float())
+    rom_std = db.Column(db.Float())
+    rep_duration_mean = db.Column(db.Float())
+    rep_duration_std = db.Column(db.Float())
+    time_under_tension = db.Column(db.Float())
+    form_stats = db.Column(db.JSON())
 
     def __repr__(self):
         return f"<User {self.user_name}>"
+
+
+class RepEvent(db.Model):
+    """One completed rep of a workout session."""
+
+    __tablename__ = "rep_event"
+
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(
+        db.Integer(), db.ForeignKey("workout_session.id"), nullable=False, index=True
+    )
+    created_date = db.Column(db.DateTime(), nullable=False)
+    rep = db.Column(db.Integer(), nullable=False)
+    duration = db.Column(db.Float(), nullable=False)
+    range_of_motion = db.Column(db.Float(), nullable=False)
+    angles_min = db.Column(db.JSON(), nullable=False)
+    angles_max = db.Column(db.JSON(), nullable=False)
+
+    def __repr__(self):
+        return f"<RepEvent {self.session_id}#{self.rep}>"
+
+
+class LeaderboardRollup(db.Model):
+    """Daily reps per player and workout, kept up to date on every insert
+    into workout_session so the leaderboard never scans raw sessions."""
+
+    __tablename__ = "leaderboard_rollup"
+
+    day = db.Column(db.Date(), primary_key=True)
+    user_name = db.Column(db.String(80), primary_key=True)
+    workout = db.Column(db.String(80), primary_key=True)
+    reps = db.Column(db.Integer(), nullable=False, default=0)
+    sessions = db.Column(db.Integer(), nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Rollup {self.day} {self.user_name} {self.workout}>"
+
+    @classmethod
+    def update(cls, session, rows):
+        """Adds a batch of workout_session rows to the daily totals.
+        Args:
+          session: the SQLAlchemy session of the inserting transaction.
+          rows: list of dict, with created_date, user_name, workout and reps.
+        """
+        totals = {}
+        for row in rows:
+            key = (row["created_date"].date(), row["user_name"], row["workout"])
+            reps, sessions = totals.get(key, (0, 0))
+            totals[key] = (reps + row["reps"], sessions + 1)
+        values = [
+            {
+                "day": day,
+                "user_name": user_name,
+                "workout": workout,
+                "reps": reps,
+                "sessions": sessions,
+            }
+            for (day, user_name, workout), (reps, sessions) in totals.items()
+        ]
+        if not values:
+            return
+
+        table = cls.__table__
+        if session.get_bind().dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.day, table.c.user_name, table.c.workout],
+                set_={
+                    "reps": table.c.reps + stmt.excluded.reps,
+                    "sessions": table.c.sessions + stmt.excluded.sessions,
+                },
+            )
+            session.execute(stmt, values)
+        else:
+            for value in values:
+                result = session.execute(
+                    table.update()
+                    .where(table.c.day == value["day"])
+                    .where(table.c.user_name == value["user_name"])
+                    .where(table.c.workout == value["workout"])
+                    .values(
+                        reps=table.c.reps + value["reps"],
+                        sessions=table.c.sessions + value["sessions"],
+                    )
+                )
+                if result.rowcount == 0:
+                    session.execute(table.insert(), value)
@@ -1,5 +1,7 @@
+import threading
 import numpy as np
 from edgetpu.basic.basic_engine import BasicEngine
+from .features import PoseFeatures
 
 
 KEYPOINTS = (
@@ -36,12 +38,20 @@ class Keypoint:
 
 
 class Pose:
-    __slots__ = ["keypoints", "score"]
+    __slots__ = ["keypoints", "score", "_features"]
 
     def __init__(self, keypoints, score=None):
         assert len(keypoints) == len(KEYPOINTS)
         self.keypoints = keypoints
         self.score = score
+        self._features = None
+
+    @property
+    def features(self):
+        """PoseFeatures, built once per detected pose, i.e. once per frame."""
+        if self._features is None:
+            self._features = PoseFeatures(self)
+        return self._features
 
     def __repr__(self):
         return f"Pose({self.keypoints}, {self.score})"
@@ -58,6 +68,8 @@ class PoseEngine(BasicEngine):
         """
         BasicEngine.__init__(self, model_path)
         self._mirror = mirror
+        # A single Edge TPU is shared by every station's capture thread
+        self._lock = threading.Lock()
 
         self._input_tensor_shape = self.get_input_tensor_shape()
         if (
@@ -94,6 +106,15 @@ class PoseEngine(BasicEngine):
         Args:
           img: numpy array containing image
         """
+        return self.ParseOutput(self.InferImage(img))
+
+    def InferImage(self, img):
+        """Fits an image to the input shape of the network and runs it.
+        Args:
+          img: numpy array containing image
+        Returns:
+          the raw (inference_time, output) of run_inference, see ParseOutput.
+        """
 
         # Extend or crop the input to match the input shape of the network.
         if img.shape[0] < self.image_height or img.shape[1] < self.image_width:
@@ -110,7 +131,8 @@ class PoseEngine(BasicEngine):
         assert img.shape == tuple(self._input_tensor_shape[1:])
 
         # Run the inference (API expects the data to be flattened)
-        return self.ParseOutput(self.run_inference(img.flatten()))
+        with self._lock:
+            return self.run_inference(img.flatten())
 
     def ParseOutput(self, output):
         inference_time, output = output
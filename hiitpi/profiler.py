@@ -0,0 +1,91 @@
+import re
+import sys
+import logging
+import threading
+import collections
+
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler(object):
+    """Samples the stacks of every thread of the process at a fixed interval.
+
+    Stacks are aggregated in memory and dumped in the collapsed format read by
+    flamegraph.pl and speedscope, one "thread;outer;...;inner count" line per
+    distinct stack. Sampling only takes the GIL for a few microseconds per
+    thread, so it can be left on during real sessions.
+    """
+
+    def __init__(self, interval=0.01, max_depth=64):
+        """
+        Args:
+          interval: float, the seconds between two samples.
+          max_depth: int, the max number of innermost frames kept per stack.
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self._counts = collections.Counter()
+        self._labels = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Sampling profiler started, every {1000 * self.interval:.0f}ms")
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def label(self, code):
+        """Returns the "function (module:line)" label of a code object."""
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename.rsplit("/", 1)[-1]
+            label = self._labels[code] = (
+                f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            )
+        return label
+
+    def sample(self):
+        """Records the current stack of every thread but the profiler's."""
+        # Request threads are numbered, they are merged under one name
+        names = {t.ident: re.sub(r"-\d+", "", t.name) for t in threading.enumerate()}
+        own = threading.get_ident()
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self.label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            stacks.append(tuple(reversed(stack)))
+        with self._lock:
+            self._counts.update(stacks)
+            self.samples += 1
+
+    def collapsed(self, reset=False):
+        """Returns the stacks in collapsed format, optionally starting over."""
+        with self._lock:
+            counts = self._counts
+            if reset:
+                self._counts = collections.Counter()
+                self.samples = 0
+        return "".join(
+            f'{";".join(stack)} {count}\n' for stack, count in counts.most_common()
+        )
@@ -1,11 +1,165 @@
+import copy
+import threading
+import collections
 import redis
 
 
+# Types of the fields kept in the session and metrics hashes, anything else is a float
+FIELD_TYPES = {
+    "reps": int,
+    "pace": float,
+    "camera_stalls": int,
+    "engine_stalls": int,
+    "thermal_level": int,
+    "throttled": int,
+}
+
+
+def decode_value(value, type_=float):
+    """Decodes a raw Redis reply into a Python number."""
+    if value is None:
+        return None
+    return type_(value)
+
+
+def decode_hash(mapping, field_types=FIELD_TYPES):
+    """Decodes a raw HGETALL reply into a dict of typed values."""
+    decoded = {}
+    for field, value in mapping.items():
+        field = field.decode() if isinstance(field, bytes) else field
+        decoded[field] = decode_value(value, field_types.get(field, float))
+    return decoded
+
+
+def encode_value(value):
+    """Encodes a value the way redis-py does before sending it."""
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class MemoryRedis(object):
+    """A thread-safe, in-process stand-in for the subset of StrictRedis used
+    by RedisClient. Replies are raw bytes, exactly like a Redis server's."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._values = {}
+        self._hashes = collections.defaultdict(dict)
+        self._lists = collections.defaultdict(collections.deque)
+
+    def set(self, name, value):
+        with self._lock:
+            self._values[name] = encode_value(value)
+            return True
+
+    def get(self, name):
+        with self._lock:
+            return self._values.get(name)
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        items = dict(mapping or {})
+        if key is not None:
+            items[key] = value
+        with self._lock:
+            fields = self._hashes[name]
+            added = sum(1 for field in items if field.encode() not in fields)
+            for field, value in items.items():
+                fields[field.encode()] = encode_value(value)
+            return added
+
+    def hgetall(self, name):
+        with self._lock:
+            return dict(self._hashes.get(name, {}))
+
+    def hincrby(self, name, key, amount=1):
+        with self._lock:
+            fields = self._hashes[name]
+            value = int(fields.get(key.encode(), b"0")) + amount
+            fields[key.encode()] = encode_value(value)
+            return value
+
+    def lpush(self, name, *values):
+        with self._lock:
+            items = self._lists[name]
+            for value in values:
+                items.appendleft(encode_value(value))
+            return len(items)
+
+    def ltrim(self, name, start, end):
+        with self._lock:
+            items = self._lists.get(name)
+            if items is not None:
+                end = None if end == -1 else end + 1
+                self._lists[name] = collections.deque(list(items)[start:end])
+            return True
+
+    def llen(self, name):
+        with self._lock:
+            return len(self._lists.get(name, ()))
+
+    def lpop(self, name):
+        with self._lock:
+            items = self._lists.get(name)
+            return items.popleft() if items else None
+
+    def delete(self, *names):
+        with self._lock:
+            deleted = 0
+            for name in names:
+                for store in (self._values, self._hashes, self._lists):
+                    if store.pop(name, None) is not None:
+                        deleted += 1
+            return deleted
+
+    def ping(self):
+        return True
+
+    def pipeline(self, transaction=True):
+        return MemoryPipeline(self)
+
+
+class MemoryPipeline(object):
+    """Buffers commands for a MemoryRedis and runs them under its lock."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self._conn, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        commands, self._commands = self._commands, []
+        with self._conn._lock:
+            return [method(*args, **kwargs) for method, args, kwargs in commands]
+
+
 class RedisClient(object):
     """Sets up a Redis database client for data storage and transmission"""
 
-    def __init__(self, host, port, db):
-        self.pool = redis.BlockingConnectionPool(host=host, port=port, db=db)
+    def __init__(self, host, port, db, namespace=None, backend="redis"):
+        """
+        Args:
+          host, port, db: the Redis server to connect to.
+          namespace: str, an optional prefix for every key.
+          backend: str, "redis" for a Redis server or "memory" to keep
+            everything in this process.
+        """
+        if backend == "memory":
+            self.pool = None
+            self._conn = MemoryRedis()
+        elif backend == "redis":
+            self.pool = redis.BlockingConnectionPool(host=host, port=port, db=db)
+        else:
+            raise ValueError(f"Unknown Redis backend: {backend}")
+        self.namespace = namespace
 
     @property
     def conn(self):
@@ -16,24 +170,64 @@ class RedisClient(object):
     def get_connection(self):
         self._conn = redis.StrictRedis(connection_pool=self.pool)
 
-        self._conn.set_response_callback(
-            "get", lambda i: float(i) if i is not None else None
-        )
-        self._conn.set_response_callback(
-            "lpop", lambda i: float(i) if i is not None else None
-        )
-        self._conn.set_response_callback("lrange", lambda l: [float(i) for i in l])
+    def namespaced(self, namespace):
+        """Returns a client sharing the same connection pool whose keys are
+        prefixed with the given namespace.
+        Args:
+          namespace: str, the key prefix, e.g. "station:0".
+        """
+        client = copy.copy(self)
+        client.namespace = namespace
+        return client
+
+    def key(self, key):
+        if self.namespace is None:
+            return key
+        return f"{self.namespace}:{key}"
+
+    def ping(self):
+        return self.conn.ping()
 
     def set(self, key, value):
-        self.conn.set(key, value)
+        self.conn.set(self.key(key), value)
 
     def get(self, key):
-        return self.conn.get(key)
+        return decode_value(self.conn.get(self.key(key)))
+
+    def hset(self, key, mapping):
+        self.conn.hset(self.key(key), mapping=mapping)
+
+    def hgetall(self, key):
+        return decode_hash(self.conn.hgetall(self.key(key)))
+
+    def hincrby(self, key, field, amount=1):
+        return self.conn.hincrby(self.key(key), field, amount)
+
+    def delete(self, *keys):
+        return self.conn.delete(*[self.key(key) for key in keys])
 
     def lpush(self, key, value, max_size=None):
-        self.conn.lpush(key, value)
-        if max_size is not None and self.conn.llen(key) > max_size:
-            self.conn.ltrim(key, 0, max_size - 1)
+        key = self.key(key)
+        pipe = self.conn.pipeline(transaction=False)
+        pipe.lpush(key, value)
+        if max_size is not None:
+            pipe.ltrim(key, 0, max_size - 1)
+        pipe.execute()
 
     def lpop(self, key):
-        return self.conn.lpop(key)
+        return decode_value(self.conn.lpop(self.key(key)))
+
+    def snapshot(self, key, pop=()):
+        """Reads a hash and pops the head of some lists in one round trip.
+        Args:
+          key: str, the hash holding the live state.
+          pop: iterable of str, the lists to pop a value from.
+        Returns:
+          (dict, list), the decoded hash and the popped values in order.
+        """
+        pipe = self.conn.pipeline(transaction=False)
+        pipe.hgetall(self.key(key))
+        for list_key in pop:
+            pipe.lpop(self.key(list_key))
+        mapping, *values = pipe.execute()
+        return decode_hash(mapping), [decode_value(v) for v in values]
@@ -0,0 +1,26 @@
+import time
+
+
+class StartupTimer(object):
+    """Records how long each import and init phase of the app takes."""
+
+    def __init__(self):
+        self.phases = []
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, name):
+        """Ends the current phase, which started at the previous mark."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @property
+    def total(self):
+        return self._last - self._start
+
+    def report(self):
+        """Returns the phases as a multi-line text table in milliseconds."""
+        width = max((len(name) for name, _ in self.phases), default=0)
+        lines = [f"{name:<{width}} {1000 * t:8.1f}ms" for name, t in self.phases]
+        lines.append(f"{'total':<{width}} {1000 * self.total:8.1f}ms")
+        return "\n".join(lines)
@@ -0,0 +1,142 @@
+import logging
+import threading
+from .camera import VideoStream
+from .frames import EncodedFrameCache
+from .history import SessionHistory
+from .workout import WORKOUTS, PEAK_WINDOW, MultiPersonWorkout
+
+
+logger = logging.getLogger(__name__)
+
+
+class Station(object):
+    """A workout station: one camera, its own Workout and its own Redis keys."""
+
+    def __init__(self, station_id, model, redis, camera_num=0):
+        """
+        Args:
+          station_id: str, the station identifier used in routes and Redis keys.
+          model: ModelLoader, of the PoseEngine shared by all stations.
+          redis: RedisClient, namespaced by the registry.
+          camera_num: int, the camera port the station records from.
+        """
+        self.id = station_id
+        self.model = model
+        self.redis = redis
+        self.video = VideoStream(camera_num=camera_num)
+        self.frames = EncodedFrameCache()
+        self.workout = None
+        # Kept once the workout stops, until the next one starts
+        self.history = None
+        self.user_name = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<Station {self.id}>"
+
+    @property
+    def running(self):
+        return self.video.closed is False
+
+    def start(self, user_name):
+        """Claims the station for a player and starts recording if needed."""
+        with self._lock:
+            self.user_name = user_name
+            if not self.running:
+                self.video.setup(model=self.model, redis=self.redis)
+                self.video.start()
+
+    def close(self):
+        """Releases the station and stops recording."""
+        with self._lock:
+            self.stop_workout()
+            self.user_name = None
+            if self.running:
+                self.video.close()
+
+    def restart_video(self):
+        """Reopens the camera of a running station whose capture stalled."""
+        with self._lock:
+            if self.running:
+                # The station keeps the workout, in case reopening fails, and
+                # the history of a stopped one stays stopped
+                history = self.history if self.workout is not None else None
+                self.video.restart(workout=self.workout, history=history)
+
+    def start_workout(
+        self,
+        workout,
+        counter="keystate",
+        peak_window=PEAK_WINDOW,
+        multi_person=False,
+        history_points=300,
+    ):
+        """Initiates a Workout object from the workout name.
+        Args:
+          workout: str, a key of WORKOUTS.
+          counter: str, the rep counter the workout uses.
+          peak_window: int, the samples averaged by the peak counter.
+          multi_person: bool, whether to count everybody in the frame.
+          history_points: int, the points of each session history series.
+        Returns:
+          Workout, the newly attached workout.
+        """
+        if multi_person:
+            self.workout = MultiPersonWorkout(
+                WORKOUTS[workout], counter=counter, peak_window=peak_window
+            )
+        else:
+            self.workout = WORKOUTS[workout](counter=counter, peak_window=peak_window)
+        self.workout.setup(redis=self.redis)
+        self.history = SessionHistory(
+            ("inference_time", "pose_score"), budget=history_points
+        )
+        self.video.set_workout(self.workout, history=self.history)
+        return self.workout
+
+    def stop_workout(self):
+        """Detaches the current Workout and returns it, if any."""
+        workout, self.workout = self.workout, None
+        self.video.set_workout(None)
+        return workout
+
+
+class StationRegistry(object):
+    """Keeps track of all the stations driven by this server."""
+
+    def __init__(self, station_ids, model, redis):
+        """
+        Args:
+          station_ids: list of str, camera ports to open, one station each.
+          model: ModelLoader, of the PoseEngine shared by all stations.
+          redis: RedisClient, the root client stations are namespaced from.
+        """
+        self.stations = {
+            str(station_id): Station(
+                str(station_id),
+                model=model,
+                redis=redis.namespaced(f"station:{station_id}"),
+                camera_num=int(station_id),
+            )
+            for station_id in station_ids
+        }
+        logger.info(f"Stations: {list(self.stations)}")
+
+    def __getitem__(self, station_id):
+        return self.stations[str(station_id)]
+
+    def __contains__(self, station_id):
+        return str(station_id) in self.stations
+
+    def __iter__(self):
+        return iter(self.stations.values())
+
+    @property
+    def ids(self):
+        return list(self.stations)
+
+    def get(self, station_id):
+        """Returns the station with the given id, or the first one."""
+        if station_id is not None and station_id in self:
+            return self[station_id]
+        return next(iter(self))
@@ -0,0 +1,171 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+# How often a cooperative stream checks for a new frame, in seconds
+POLL_INTERVAL = 0.005
+
+# The message a WebSocket client sends once it has displayed a frame
+ACK = "ack"
+
+_cooperative = False
+
+
+def configure(server):
+    """Picks blocking primitives matching the server the app runs under.
+    Args:
+      server: str, "dev" for threaded Werkzeug or "gevent" for greenlets.
+    """
+    global _cooperative
+    if server == "gevent":
+        import gevent  # noqa: F401
+
+        _cooperative = True
+    elif server == "dev":
+        _cooperative = False
+    else:
+        raise ValueError(f"Unknown server: {server}")
+
+
+def cooperative():
+    """Whether streams run as greenlets and must never block the hub."""
+    return _cooperative
+
+
+def sleep(seconds):
+    if _cooperative:
+        import gevent
+
+        gevent.sleep(seconds)
+    else:
+        time.sleep(seconds)
+
+
+def wait_for(condition, predicate, timeout):
+    """Waits until predicate() holds, like condition.wait_for(), but by
+    polling when running under gevent since the condition is notified from
+    the camera's native thread.
+    Returns:
+      bool, the last value of predicate().
+    """
+    if not _cooperative:
+        with condition:
+            return condition.wait_for(predicate, timeout)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while not predicate():
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        sleep(POLL_INTERVAL)
+    return True
+
+
+def executor(max_workers, thread_name_prefix):
+    """Returns a thread pool whose futures can be waited on by streams."""
+    if _cooperative:
+        from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+
+        return GeventThreadPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix=thread_name_prefix
+    )
+
+
+def send_acked(ws, chunks, ack_timeout):
+    """Sends chunks as binary WebSocket messages, each one only once the client
+    has acknowledged the previous one, so at most one frame is ever in flight
+    and the next chunk pulled is the newest frame.
+    Args:
+      ws: geventwebsocket WebSocket.
+      chunks: iterable of bytes.
+      ack_timeout: float, the seconds to wait for an ack before giving up.
+    Returns:
+      list of float, the round trip of each acknowledged frame in seconds.
+    """
+    import gevent
+    from geventwebsocket.exceptions import WebSocketError
+
+    round_trips = []
+    try:
+        for chunk in chunks:
+            sent = time.monotonic()
+            ws.send(chunk, binary=True)
+            ack = None
+            with gevent.Timeout(ack_timeout, False):
+                ack = ws.receive()
+            if ack != ACK:
+                # None when the client closed the socket or never answered
+                break
+            round_trips.append(time.monotonic() - sent)
+    except WebSocketError as e:
+        logger.info(f"WebSocket closed: {e}")
+    return round_trips
+
+
+class StreamLimiter(object):
+    """Caps the number of concurrent long-lived streaming responses."""
+
+    def __init__(self, max_streams):
+        """
+        Args:
+          max_streams: int, the max number of streams served at once.
+        """
+        self.max_streams = max_streams
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes a slot, returns False if all of them are in use."""
+        with self._lock:
+            if self.active >= self.max_streams:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+
+    def stream(self, chunks, name):
+        """Wraps a response body served in a slot taken with acquire().
+        Args:
+          chunks: generator, the response body.
+          name: str, a description for the logs.
+        """
+        return _LimitedStream(self, chunks, name)
+
+
+class _LimitedStream(object):
+    """A response body releasing its limiter slot and closing its source
+    as soon as the server closes it, e.g. when the client disconnects,
+    even if it was never iterated."""
+
+    def __init__(self, limiter, chunks, name):
+        self._limiter = limiter
+        self._chunks = chunks
+        self._name = name
+        self._closed = False
+        logger.info(f"Stream opened: {name} ({limiter.active}/{limiter.max_streams})")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._chunks)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._chunks.close()
+        finally:
+            self._limiter.release()
+            logger.info(
+                f"Stream closed: {self._name} "
+                f"({self._limiter.active}/{self._limiter.max_streams})"
+            )
@@ -0,0 +1,96 @@
+import time
+import numpy as np
+
+
+# The body scale (px) assumed for poses whose torso isn't visible
+DEFAULT_SCALE = 80.0
+
+
+class PoseTracker:
+    """Associates detected poses with persistent person IDs across frames.
+
+    Each person is represented by the centroid of their confident keypoints;
+    new poses are matched to known people greedily by increasing centroid
+    distance relative to the body scale, computed for all pairs at once, so
+    matching holds near and far from the camera. Poses scoring below
+    `min_score` are ignored, so spurious detections never get an ID.
+    """
+
+    def __init__(self, max_distance=1.5, max_age=3.0, min_score=0.3):
+        """
+        Args:
+          max_distance: float, the max centroid shift between two frames for
+            a pose to be matched to a known person, in body scales, see
+            PoseFeatures.scale.
+          max_age: float, the seconds a person can go unseen before their ID
+            is dropped, independent of the frame and inference rates.
+          min_score: float, the min pose score to be tracked.
+        """
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self.min_score = min_score
+        self._ids = np.empty(0, dtype=int)
+        self._centroids = np.empty((0, 2))
+        self._seen = np.empty(0)
+        self._next_id = 1
+        # The IDs dropped by the last update
+        self.expired = []
+
+    def centroids(self, poses):
+        """Returns the (n, 2) keypoint centroids of the given poses."""
+        return np.array([pose.features.centroid for pose in poses]).reshape(-1, 2)
+
+    def scales(self, poses):
+        """Returns the (n,) body scales of the given poses, in pixels."""
+        scales = np.array([pose.features.scale for pose in poses], dtype=float)
+        return np.where(np.isnan(scales), DEFAULT_SCALE, scales)
+
+    def update(self, poses, now=None):
+        """Matches poses to person IDs.
+        Args:
+          poses: list of Pose, detected in the current frame.
+          now: float, the monotonic time of the frame, the current time if None.
+        Returns:
+          dict, person ID -> Pose.
+        """
+        now = time.monotonic() if now is None else now
+        poses = [pose for pose in poses if pose.score >= self.min_score]
+        centroids = self.centroids(poses) if poses else np.empty((0, 2))
+        n_tracks, n_poses = len(self._ids), len(centroids)
+
+        assigned = np.full(n_poses, -1)
+        matched = np.zeros(n_tracks, dtype=bool)
+        if n_tracks and n_poses:
+            dist = np.linalg.norm(
+                self._centroids[:, None, :] - centroids[None, :, :], axis=2
+            ) / self.scales(poses)
+            for flat in np.argsort(dist, axis=None):
+                t, p = divmod(int(flat), n_poses)
+                if dist[t, p] > self.max_distance:
+                    break
+                if matched[t] or assigned[p] >= 0:
+                    continue
+                matched[t] = True
+                assigned[p] = t
+
+        self._seen[assigned[assigned >= 0]] = now
+        self._centroids[assigned[assigned >= 0]] = centroids[assigned >= 0]
+
+        new = assigned < 0
+        n_new = int(new.sum())
+        new_ids = np.arange(self._next_id, self._next_id + n_new)
+        self._next_id += n_new
+
+        people = {}
+        for p, t in enumerate(assigned):
+            if t >= 0:
+                people[int(self._ids[t])] = poses[p]
+        for person_id, p in zip(new_ids, np.flatnonzero(new)):
+            people[int(person_id)] = poses[p]
+
+        keep = now - self._seen <= self.max_age
+        self.expired = [int(i) for i in self._ids[~keep]]
+        self._ids = np.concatenate([self._ids[keep], new_ids])
+        self._centroids = np.concatenate([self._centroids[keep], centroids[new]])
+        self._seen = np.concatenate([self._seen[keep], np.full(n_new, now)])
+        return people
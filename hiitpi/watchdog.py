@@ -0,0 +1,128 @@
+import time
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class Watchdog(object):
+    """Watches the capture and inference of every running station and recovers
+    from stalls without restarting the app.
+
+    A frame that takes longer than `inference_deadline` to go through the TPU
+    means the engine hung: the model is reloaded and the station's camera,
+    whose capture thread is stuck in the old engine, is reopened. No frame for
+    `frame_deadline` means the camera stopped delivering: it is reopened.
+    A model that failed to load, which stalls no inference since none runs,
+    is reloaded again with exponential backoff. Stalls and reload retries
+    are counted in each station's "metrics" Redis hash.
+    """
+
+    def __init__(
+        self,
+        stations,
+        model,
+        frame_deadline=5.0,
+        inference_deadline=2.0,
+        retry_delay=5.0,
+        max_retry_delay=300.0,
+    ):
+        """
+        Args:
+          stations: StationRegistry.
+          model: ModelLoader, shared by all stations.
+          frame_deadline: float, the max seconds between two captured frames.
+          inference_deadline: float, the max seconds a single inference takes.
+          retry_delay: float, the seconds before the first retry of a failed
+            model load, doubled after every failed retry.
+          max_retry_delay: float, the max seconds between two retries.
+        """
+        self.stations = stations
+        self.model = model
+        self.frame_deadline = frame_deadline
+        self.inference_deadline = inference_deadline
+        self.interval = min(frame_deadline, inference_deadline) / 2
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._next_retry = None
+        self._retries = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="watchdog", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.check_model()
+            except Exception:
+                logger.exception("Watchdog failed to check the model")
+            for station in self.stations:
+                try:
+                    self.check(station)
+                except Exception:
+                    logger.exception(f"Watchdog failed to check {station}")
+
+    def check_model(self, now=None):
+        """Reloads a model that failed to load once its backoff has elapsed.
+        Returns:
+          bool, whether a reload was started.
+        """
+        model = self.model
+        if model.ready or model.loading or model.error is None:
+            if model.ready:
+                self._next_retry, self._retries = None, 0
+            return False
+        now = time.monotonic() if now is None else now
+        if self._next_retry is None:
+            self._next_retry = now + self.retry_delay
+        if now < self._next_retry:
+            return False
+
+        self._retries += 1
+        self._next_retry = now + min(
+            self.retry_delay * 2 ** self._retries, self.max_retry_delay
+        )
+        logger.error(f"Model failed to load ({model.error}), retry {self._retries}")
+        for station in self.stations:
+            if station.running:
+                station.redis.hincrby("metrics", "model_reload_retries")
+        model.reload()
+        return True
+
+    def check(self, station):
+        """Recovers a station from a stall, if any.
+        Returns:
+          str, "engine" or "camera" for the stall recovered from, or None.
+        """
+        if not station.running:
+            return None
+        stream = station.video.stream
+        now = time.monotonic()
+        inference_started = stream.inference_started
+
+        if (
+            inference_started is not None
+            and now - inference_started > self.inference_deadline
+        ):
+            logger.warning(
+                f"{station}: inference stalled for {now - inference_started:.1f}s"
+            )
+            station.redis.hincrby("metrics", "engine_stalls")
+            self.model.reload()
+            station.restart_video()
+            return "engine"
+
+        if now - stream.last_capture > self.frame_deadline:
+            logger.warning(f"{station}: no frame for {now - stream.last_capture:.1f}s")
+            station.redis.hincrby("metrics", "camera_stalls")
+            station.restart_video()
+            return "camera"
+        return None
@@ -1,71 +1,187 @@
-import sys
+import math
+import bisect
 import logging
 import time
+import datetime
 import itertools
 import collections
 import numpy as np
+from .tracker import PoseTracker
 
 
-logging.basicConfig(
-    stream=sys.stdout,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt=" %I:%M:%S ",
-    level="DEBUG",
-)
-
 logger = logging.getLogger(__name__)
 
+# Histogram bin edges of the per-rep form metrics, out of range values are
+# counted in the first or last bin
+RANGE_OF_MOTION_BINS = tuple(range(0, 181, 15))
+REP_DURATION_BINS = (0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 6.0, 10.0)
 
-class Edge:
-    __slots__ = ["k_a", "k_b", "vec", "norm", "center", "score"]
+# Samples averaged by the peak counter, about 0.2s at the camera's 24 fps,
+# enough to smooth out pose jitter while keeping peaks sharp
+PEAK_WINDOW = 5
 
-    def __init__(self, k_a, k_b):
-        self.k_a = k_a
-        self.k_b = k_b
-        self.vec = self.k_a.yx - self.k_b.yx
-        self.norm = np.linalg.norm(self.vec)
-        self.center = (self.k_a.yx + self.k_b.yx) / 2
-        self.score = min(self.k_a.score, self.k_b.score)
+# Seconds between two publications of the form metrics to Redis
+FORM_PUBLISH_INTERVAL = 1.0
 
-    def __repr__(self):
-        return f"Edge({self.k_a.k} -> {self.k_b.k}, {self.vec})"
+# The share of a workout's HYSTERESIS the signal has to move by to count as
+# movement, and the longest gap between two such moves that counts as moving
+MOTION_THRESHOLD = 0.25
+MOTION_GAP = 0.5
 
-    def __invert__(self):
-        return Edge(self.k_b, self.k_a)
 
-    def find_angle(self, edge):
-        cosang = np.dot(self.vec, edge.vec)
-        sinang = np.linalg.norm(np.cross(self.vec, edge.vec))
-        angle = np.arctan2(sinang, cosang)
-        return np.degrees(angle)
+class PeakCounter:
+    """Counts reps as peaks of a 1-D movement signal, in O(1) per sample.
 
+    Samples are smoothed with a moving average over a small ring buffer. A
+    peak is confirmed once the smoothed signal falls `hysteresis` below its
+    running maximum, after having risen `hysteresis` above the last valley,
+    so jitter and missing samples between extremes don't matter.
+    """
 
-class Joint:
-    __slots__ = ["e_a", "e_b", "angle"]
+    def __init__(self, hysteresis, window=PEAK_WINDOW):
+        """
+        Args:
+          hysteresis: float, the swing needed to confirm a peak or a valley.
+          window: int, the number of samples averaged for smoothing.
+        """
+        self.hysteresis = hysteresis
+        self._buffer = np.zeros(window)
+        self._sum = 0.0
+        self._n = 0
+        self._rising = False
+        self._lo = None
+        self._hi = None
+        self.value = None
+
+    def smooth(self, x):
+        i = self._n % len(self._buffer)
+        self._sum += x - self._buffer[i]
+        self._buffer[i] = x
+        self._n += 1
+        return self._sum / min(self._n, len(self._buffer))
+
+    def update(self, x):
+        """Adds a sample and returns True when it confirms a new peak."""
+        v = self.value = self.smooth(x)
+        if self._lo is None:
+            self._lo = self._hi = v
+        elif self._rising:
+            if v > self._hi:
+                self._hi = v
+            elif v < self._hi - self.hysteresis:
+                self._rising = False
+                self._lo = v
+                return True
+        else:
+            if v < self._lo:
+                self._lo = v
+            elif v > self._lo + self.hysteresis:
+                self._rising = True
+                self._hi = v
+        return False
 
-    def __init__(self, e_a, e_b):
-        self.e_a = e_a
-        self.e_b = e_b
-        self.angle = self.e_a.find_angle(self.e_b)
 
-    def __repr__(self):
-        return f"Joint({self.e_a}, {self.e_b}, {self.angle})"
+class RunningStats:
+    """Streaming count, mean, variance, min, max, sum and histogram of a
+    metric, in O(1) memory. The variance uses Welford's algorithm, which
+    stays accurate over long sessions unlike a running sum of squares.
+    """
+
+    def __init__(self, bins=None):
+        """
+        Args:
+          bins: tuple of float, increasing histogram bin edges, or None.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.total = 0.0
+        self.bins = bins
+        self.histogram = [0] * (len(bins) - 1) if bins else None
+
+    def update(self, x):
+        x = float(x)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        self.total += x
+        if self.bins:
+            i = bisect.bisect_right(self.bins, x) - 1
+            self.histogram[min(max(i, 0), len(self.histogram) - 1)] += 1
+
+    @property
+    def variance(self):
+        """The sample variance, 0 until there are two values."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def summary(self):
+        """Returns the aggregates as a JSON-serializable dict."""
+        summary = {
+            "count": self.count,
+            "mean": self.mean if self.count else None,
+            "std": self.std if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "total": self.total,
+        }
+        if self.bins:
+            summary["bins"] = list(self.bins)
+            summary["histogram"] = list(self.histogram)
+        return summary
 
 
 class Workout:
     """Base class for tracking workout progress with movement analysis"""
 
-    def __init__(self, n_keystates):
+    # The swing of get_signal() that makes a rep for the peak counter
+    HYSTERESIS = None
+
+    def __init__(self, n_keystates, counter="keystate", peak_window=PEAK_WINDOW):
+        """
+        Args:
+          n_keystates: int, the number of key states in a rep.
+          counter: str, "keystate" to count full cycles through the key
+            states, or "peak" to count peaks of get_signal(), which holds up
+            better with noisy poses and low inference rates.
+          peak_window: int, the number of samples the peak counter averages.
+        """
         self.THRESHOLD = 0.2
         self.N_KEYSTATES = n_keystates
         self.KEYSTATES = itertools.cycle(range(1, self.N_KEYSTATES + 1))
         self._prev_state = None
         self._next_state = next(self.KEYSTATES)
+        if counter == "peak":
+            self._counter = PeakCounter(self.HYSTERESIS, window=peak_window)
+        elif counter == "keystate":
+            self._counter = None
+        else:
+            raise ValueError(f"Unknown rep counter: {counter}")
         self.stats = None
         self.reps = 0
         self.pace = 0
         self._init_time = time.perf_counter()
         self._reps_time = collections.deque([], maxlen=32)
+        self._rep_moving = 0.0
+        self._rep_angles = {}
+        self._motion_signal = None
+        self._motion_time = None
+        self.rep_events = []
+        # Form metrics per rep, and every stat of get_stats() per frame
+        self.form = {
+            "range_of_motion": RunningStats(bins=RANGE_OF_MOTION_BINS),
+            "rep_duration": RunningStats(bins=REP_DURATION_BINS),
+        }
+        self.running_stats = {}
+        self._form_published = 0.0
 
     def setup(self, redis):
         """
@@ -74,8 +190,8 @@ class Workout:
         """
         self.redis = redis
 
-        self.redis.set("reps", self.reps)
-        self.redis.set("pace", self.pace)
+        self.redis.hset("session", {"reps": self.reps, "pace": self.pace})
+        self.redis.delete("form")
 
     def get_stats(self, pose):
         raise NotImplemented
@@ -83,27 +199,128 @@ class Workout:
     def get_state(self, stats):
         raise NotImplemented
 
+    def get_signal(self, stats):
+        raise NotImplemented
+
+    def people(self):
+        """Returns (person ID, Workout) pairs, None being the logged-in player."""
+        return [(None, self)]
+
+    def update_poses(self, poses):
+        """Updates with the most confident of the poses detected in a frame."""
+        self.update(max(poses, key=lambda pose: pose.score) if poses else None)
+
     def update(self, pose):
         if pose:
             self.stats = self.get_stats(pose)
-            state = self.get_state(self.stats)
+            self._track_rep(self.stats)
+            self._publish_form()
 
+            if self._counter is not None:
+                if self.stats is not None:
+                    if self._counter.update(self.get_signal(self.stats)):
+                        self._count_rep()
+                return
+
+            state = self.get_state(self.stats)
             if state != 0 and state != self._prev_state and state == self._next_state:
                 self._prev_state = state
                 self._next_state = next(self.KEYSTATES)
                 if state == self.N_KEYSTATES:
-                    self._reps_time.append(time.perf_counter())
-                    if self.reps > 1:
-                        self.pace = (len(self._reps_time) - 1) / (
-                            self._reps_time[-1] - self._reps_time[0]
-                        )
-                    self.reps += 1
-                    self.redis.set("reps", self.reps)
-                    self.redis.set("pace", self.pace)
+                    self._count_rep()
+
+    def _track_rep(self, stats):
+        """Keeps the min/max of every joint angle and the time spent moving
+        during the current rep. Holding still, e.g. before the first rep or
+        between reps, adds no time, nor angles until the body moves again.
+        """
+        if stats is None:
+            return
+        now = time.perf_counter()
+        signal = self.get_signal(stats)
+        if self._motion_signal is None:
+            self._motion_signal, self._motion_time = signal, now
+        elif abs(signal - self._motion_signal) > self.HYSTERESIS * MOTION_THRESHOLD:
+            # After a long still gap, only its end counts as moving
+            self._rep_moving += min(now - self._motion_time, MOTION_GAP)
+            self._motion_signal, self._motion_time = signal, now
+        if not self._rep_moving:
+            # Still at rest, the rep's angles start from this frame
+            self._rep_angles = {}
+        for k, v in stats.items():
+            if k not in self.running_stats:
+                self.running_stats[k] = RunningStats()
+            self.running_stats[k].update(v)
+            if k.startswith("j_"):
+                lo, hi = self._rep_angles.get(k, (v, v))
+                self._rep_angles[k] = (min(lo, v), max(hi, v))
+
+    def _count_rep(self):
+        """Books a completed rep: pace, Redis state and the rep event log."""
+        now = time.perf_counter()
+        self._reps_time.append(now)
+        if self.reps > 1:
+            self.pace = (len(self._reps_time) - 1) / (
+                self._reps_time[-1] - self._reps_time[0]
+            )
+        self.reps += 1
+        self.redis.hset("session", {"reps": self.reps, "pace": self.pace})
+
+        angles = self._rep_angles
+        duration = self._rep_moving
+        range_of_motion = float(
+            max((hi - lo for lo, hi in angles.values()), default=0.0)
+        )
+        self.form["rep_duration"].update(duration)
+        self.form["range_of_motion"].update(range_of_motion)
+        self.rep_events.append(
+            {
+                "created_date": datetime.datetime.utcnow(),
+                "rep": self.reps,
+                "duration": duration,
+                "range_of_motion": range_of_motion,
+                "angles_min": {k: float(lo) for k, (lo, hi) in angles.items()},
+                "angles_max": {k: float(hi) for k, (lo, hi) in angles.items()},
+            }
+        )
+        self._rep_moving = 0.0
+        self._rep_angles = {}
+
+    def form_metrics(self):
+        """Returns the session's form metrics, named like WorkoutSession's
+        columns, None until a rep is counted."""
+        rom, duration = self.form["range_of_motion"], self.form["rep_duration"]
+        counted = duration.count > 0
+        return {
+            "rom_mean": rom.mean if counted else None,
+            "rom_std": rom.std if counted else None,
+            "rep_duration_mean": duration.mean if counted else None,
+            "rep_duration_std": duration.std if counted else None,
+            # The time spent moving through counted reps, rests left out
+            "time_under_tension": duration.total if counted else None,
+        }
+
+    def form_summary(self):
+        """Returns every aggregate, histograms included, for the session row."""
+        return {
+            **{k: v.summary() for k, v in self.form.items()},
+            "stats": {k: v.summary() for k, v in self.running_stats.items()},
+        }
+
+    def _publish_form(self):
+        """Writes the form metrics to the "form" Redis hash, at a low rate."""
+        now = time.perf_counter()
+        if now - self._form_published < FORM_PUBLISH_INTERVAL:
+            return
+        self._form_published = now
+        metrics = {k: v for k, v in self.form_metrics().items() if v is not None}
+        if metrics:
+            self.redis.hset("form", metrics)
 
 
 class ToeTap(Workout):
     name = "Toe Tap"
+    HYSTERESIS = 40
 
     def __init__(self, *args, **kwargs):
         super().__init__(n_keystates=2, *args, **kwargs)
@@ -121,29 +338,24 @@ class ToeTap(Workout):
         ]
 
     def get_stats(self, pose):
-        kps = pose.keypoints
-
-        if all(kps[k].score > self.THRESHOLD for k in self.KEYPOINTS):
-
-            e_hips = Edge(kps["left hip"], kps["right hip"])
-            e_ankles = Edge(kps["left ankle"], kps["right ankle"])
-            e_lelbow_lshoulder = Edge(kps["left elbow"], kps["left shoulder"])
-            e_lelbow_lwrist = Edge(kps["left elbow"], kps["left wrist"])
-            e_relbow_rshoulder = Edge(kps["right elbow"], kps["right shoulder"])
-            e_relbow_rwrist = Edge(kps["right elbow"], kps["right wrist"])
-
-            j_lelbow = Joint(e_lelbow_lshoulder, e_lelbow_lwrist)
-            j_relbow = Joint(e_relbow_rshoulder, e_relbow_rwrist)
+        f = pose.features
 
+        if f.visible(self.KEYPOINTS):
             return {
-                "e_hips_norm": e_hips.norm,
-                "e_ankles_norm": e_ankles.norm,
-                "j_lelbow_angle": j_lelbow.angle,
-                "j_relbow_angle": j_relbow.angle,
+                "e_hips_norm": f.norm("left hip", "right hip"),
+                "e_ankles_norm": f.norm("left ankle", "right ankle"),
+                "j_lelbow_angle": f.angle("left elbow", "left shoulder", "left wrist"),
+                "j_relbow_angle": f.angle(
+                    "right elbow", "right shoulder", "right wrist"
+                ),
             }
         else:
             return None
 
+    def get_signal(self, stats):
+        # Swings between the left and the right arm leading
+        return stats["j_lelbow_angle"] - stats["j_relbow_angle"]
+
     def get_state(self, stats):
         if stats is not None:
             if stats["e_ankles_norm"] <= stats["e_hips_norm"]:
@@ -161,6 +373,7 @@ class ToeTap(Workout):
 
 class JumpingJacks(Workout):
     name = "Jumping Jacks"
+    HYSTERESIS = 50
 
     def __init__(self, *args, **kwargs):
         super().__init__(n_keystates=2, *args, **kwargs)
@@ -176,29 +389,25 @@ class JumpingJacks(Workout):
         ]
 
     def get_stats(self, pose):
-        kps = pose.keypoints
-
-        if all(kps[k].score > self.THRESHOLD for k in self.KEYPOINTS):
-
-            e_hips = Edge(kps["left hip"], kps["right hip"])
-            e_ankles = Edge(kps["left ankle"], kps["right ankle"])
-            e_lshoulder_lelbow = Edge(kps["left shoulder"], kps["left elbow"])
-            e_lshoulder_lhip = Edge(kps["left shoulder"], kps["left hip"])
-            e_rshoulder_relbow = Edge(kps["right shoulder"], kps["right elbow"])
-            e_rshoulder_rhip = Edge(kps["right shoulder"], kps["right hip"])
-
-            j_lshoulder = Joint(e_lshoulder_lelbow, e_lshoulder_lhip)
-            j_rshoulder = Joint(e_rshoulder_relbow, e_rshoulder_rhip)
+        f = pose.features
 
+        if f.visible(self.KEYPOINTS):
             return {
-                "e_hips_norm": e_hips.norm,
-                "e_ankles_norm": e_ankles.norm,
-                "j_lshoulder_angle": j_lshoulder.angle,
-                "j_rshoulder_angle": j_rshoulder.angle,
+                "e_hips_norm": f.norm("left hip", "right hip"),
+                "e_ankles_norm": f.norm("left ankle", "right ankle"),
+                "j_lshoulder_angle": f.angle(
+                    "left shoulder", "left elbow", "left hip"
+                ),
+                "j_rshoulder_angle": f.angle(
+                    "right shoulder", "right elbow", "right hip"
+                ),
             }
         else:
             return None
 
+    def get_signal(self, stats):
+        return (stats["j_lshoulder_angle"] + stats["j_rshoulder_angle"]) / 2
+
     def get_state(self, stats):
         if stats is not None:
             if (
@@ -221,6 +430,7 @@ class JumpingJacks(Workout):
 
 class PushUp(Workout):
     name = "Push Up"
+    HYSTERESIS = 30
 
     def __init__(self, *args, **kwargs):
         super().__init__(n_keystates=2, *args, **kwargs)
@@ -234,30 +444,27 @@ class PushUp(Workout):
         ]
 
     def get_stats(self, pose):
-        kps = pose.keypoints
-
-        if all(kps[k].score > self.THRESHOLD for k in self.KEYPOINTS):
-
-            e_lelbow_lshoulder = Edge(kps["left elbow"], kps["left shoulder"])
-            e_lelbow_lwrist = Edge(kps["left elbow"], kps["left wrist"])
-            e_relbow_rshoulder = Edge(kps["right elbow"], kps["right shoulder"])
-            e_relbow_rwrist = Edge(kps["right elbow"], kps["right wrist"])
-            e_lshoulder_rshoulder = Edge(kps["left shoulder"], kps["right shoulder"])
-
-            j_lelbow = Joint(e_lelbow_lshoulder, e_lelbow_lwrist)
-            j_relbow = Joint(e_relbow_rshoulder, e_relbow_rwrist)
-            j_lshoulder = Joint(e_lshoulder_rshoulder, ~e_lelbow_lshoulder)
-            j_rshoulder = Joint(~e_lshoulder_rshoulder, ~e_relbow_rshoulder)
+        f = pose.features
 
+        if f.visible(self.KEYPOINTS):
             return {
-                "j_lelbow_angle": j_lelbow.angle,
-                "j_relbow_angle": j_relbow.angle,
-                "j_lshoulder_angle": j_lshoulder.angle,
-                "j_rshoulder_angle": j_rshoulder.angle,
+                "j_lelbow_angle": f.angle("left elbow", "left shoulder", "left wrist"),
+                "j_relbow_angle": f.angle(
+                    "right elbow", "right shoulder", "right wrist"
+                ),
+                "j_lshoulder_angle": f.angle(
+                    "left shoulder", "right shoulder", "left elbow"
+                ),
+                "j_rshoulder_angle": f.angle(
+                    "right shoulder", "left shoulder", "right elbow"
+                ),
             }
         else:
             return None
 
+    def get_signal(self, stats):
+        return (stats["j_lelbow_angle"] + stats["j_relbow_angle"]) / 2
+
     def get_state(self, stats):
         if stats is not None:
             if (
@@ -282,6 +489,7 @@ class PushUp(Workout):
 
 class SideSquatJump(Workout):
     name = "Side Squat Jump"
+    HYSTERESIS = 0.4
 
     def __init__(self, *args, **kwargs):
         super().__init__(n_keystates=3, *args, **kwargs)
@@ -301,35 +509,25 @@ class SideSquatJump(Workout):
         ]
 
     def get_stats(self, pose):
-        kps = pose.keypoints
-
-        if all(kps[k].score > self.THRESHOLD for k in self.KEYPOINTS):
-
-            e_lelbow_lshoulder = Edge(kps["left elbow"], kps["left shoulder"])
-            e_lelbow_lwrist = Edge(kps["left elbow"], kps["left wrist"])
-            e_relbow_rshoulder = Edge(kps["right elbow"], kps["right shoulder"])
-            e_relbow_rwrist = Edge(kps["right elbow"], kps["right wrist"])
-
-            e_lshoulder_rshoulder = Edge(kps["left shoulder"], kps["right shoulder"])
-            e_lwrist_rwrist = Edge(kps["left wrist"], kps["right wrist"])
-
-            e_hips = Edge(kps["left hip"], kps["right hip"])
-            e_ankles = Edge(kps["left ankle"], kps["right ankle"])
-
-            j_lelbow = Joint(e_lelbow_lshoulder, e_lelbow_lwrist)
-            j_relbow = Joint(e_relbow_rshoulder, e_relbow_rwrist)
+        f = pose.features
 
+        if f.visible(self.KEYPOINTS):
             return {
-                "e_shoulders_norm": e_lshoulder_rshoulder.norm,
-                "e_wrists_norm": e_lwrist_rwrist.norm,
-                "e_hips_norm": e_hips.norm,
-                "e_ankles_norm": e_ankles.norm,
-                "j_lelbow_angle": j_lelbow.angle,
-                "j_relbow_angle": j_relbow.angle,
+                "e_shoulders_norm": f.norm("left shoulder", "right shoulder"),
+                "e_wrists_norm": f.norm("left wrist", "right wrist"),
+                "e_hips_norm": f.norm("left hip", "right hip"),
+                "e_ankles_norm": f.norm("left ankle", "right ankle"),
+                "j_lelbow_angle": f.angle("left elbow", "left shoulder", "left wrist"),
+                "j_relbow_angle": f.angle(
+                    "right elbow", "right shoulder", "right wrist"
+                ),
             }
         else:
             return None
 
+    def get_signal(self, stats):
+        return stats["e_ankles_norm"] / stats["e_hips_norm"]
+
     def get_state(self, stats):
         if stats is not None:
             if (
@@ -356,6 +554,125 @@ class SideSquatJump(Workout):
             return 0
 
 
+class MultiPersonWorkout:
+    """Runs a separate Workout for every person tracked in the frame.
+
+    The logged-in player is the first person seen and drives the dashboard.
+    If the player's track is lost, e.g. while occluded, their Workout goes
+    to the newest person in the frame without reps, so their reps carry on.
+    Partners who leave without a rep are forgotten.
+    """
+
+    def __init__(self, workout_cls, **kwargs):
+        """
+        Args:
+          workout_cls: type, the Workout subclass everybody is doing.
+          kwargs: passed on to each Workout.
+        """
+        self.name = workout_cls.name
+        self._workout_cls = workout_cls
+        self._kwargs = kwargs
+        self._tracker = PoseTracker()
+        self._primary = None
+        self.primary_id = None
+        self.workouts = {}
+        self.tracked = {}
+
+    def setup(self, redis):
+        """
+        Args:
+          redis: RedisClient, partners get their own namespace under it.
+        """
+        self.redis = redis
+        # Clears the previous workout off the dashboard until someone shows up
+        self.redis.hset("session", {"reps": 0, "pace": 0})
+        self.redis.delete("form")
+
+    def _workout(self, person_id):
+        if person_id not in self.workouts:
+            if self.primary_id is None:
+                if self._primary is None:
+                    self._primary = self._workout_cls(**self._kwargs)
+                    self._primary.setup(redis=self.redis)
+                self.primary_id = person_id
+                self.workouts[person_id] = self._primary
+            else:
+                workout = self._workout_cls(**self._kwargs)
+                workout.setup(
+                    redis=self.redis.namespaced(
+                        self.redis.key(f"person:{person_id}")
+                    )
+                )
+                self.workouts[person_id] = workout
+        return self.workouts[person_id]
+
+    def _forget(self, person_id):
+        """Drops a partner with no reps, and their Redis keys."""
+        workout = self.workouts.pop(person_id)
+        workout.redis.delete("session", "form")
+
+    def _expire(self, person_ids):
+        """Drops the tracks the tracker lost, keeping partners with reps."""
+        for person_id in person_ids:
+            workout = self.workouts.get(person_id)
+            if person_id == self.primary_id:
+                del self.workouts[person_id]
+                self.primary_id = None
+            elif workout is not None and not workout.reps:
+                self._forget(person_id)
+
+    def _elect(self, tracked):
+        """Hands the player's Workout to the newest person without reps."""
+        candidates = [
+            person_id
+            for person_id in tracked
+            if person_id not in self.workouts or not self.workouts[person_id].reps
+        ]
+        if candidates:
+            person_id = max(candidates)
+            if person_id in self.workouts:
+                self._forget(person_id)
+            self.primary_id = person_id
+            self.workouts[person_id] = self._primary
+
+    @property
+    def primary(self):
+        return self._primary
+
+    @property
+    def stats(self):
+        return self.primary.stats if self.primary is not None else None
+
+    @property
+    def reps(self):
+        return self.primary.reps if self.primary is not None else 0
+
+    @property
+    def pace(self):
+        return self.primary.pace if self.primary is not None else 0
+
+    @property
+    def rep_events(self):
+        return self.primary.rep_events if self.primary is not None else []
+
+    def people(self):
+        people = [(None, self._primary)] if self._primary is not None else []
+        return people + [
+            (person_id, workout)
+            for person_id, workout in self.workouts.items()
+            if workout is not self._primary
+        ]
+
+    def update_poses(self, poses):
+        tracked = self._tracker.update(poses or [])
+        self._expire(self._tracker.expired)
+        if self.primary_id is None and self._primary is not None:
+            self._elect(tracked)
+        for person_id, pose in tracked.items():
+            self._workout(person_id).update(pose)
+        self.tracked = tracked
+
+
 WORKOUTS = {
     "toe_tap": ToeTap,
     "jumping_jacks": JumpingJacks,
@@ -0,0 +1,169 @@
+import time
+import queue
+import atexit
+import logging
+import datetime
+import threading
+from sqlalchemy.exc import DBAPIError, OperationalError
+from .model import WorkoutSession, RepEvent, LeaderboardRollup
+
+
+logger = logging.getLogger(__name__)
+
+
+class SessionWriter(object):
+    """Writes WorkoutSession rows to the database from a background thread.
+
+    Callers enqueue plain dicts and return immediately; the writer batches
+    whatever is pending into executemany INSERTs, one for the sessions and
+    one for all of their rep events, folds the sessions into the leaderboard
+    rollup in the same transaction and retries transient failures with
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        app,
+        db,
+        on_commit=None,
+        batch_size=32,
+        flush_interval=1.0,
+        max_retries=5,
+    ):
+        """
+        Args:
+          app: Flask, the server whose app context the writer runs in.
+          db: SQLAlchemy.
+          on_commit: callable, invoked in the app context after each commit.
+          batch_size: int, the max number of rows per INSERT.
+          flush_interval: float, seconds to wait for more rows before writing.
+          max_retries: int, the number of attempts before a batch is dropped.
+        """
+        self.app = app
+        self.db = db
+        self.on_commit = on_commit
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue = queue.Queue()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="session-writer", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def close(self, timeout=10.0):
+        """Flushes pending rows and stops the writer."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def put(self, rep_events=(), **row):
+        """Enqueues a WorkoutSession row.
+        Args:
+          rep_events: list of dict, the RepEvent rows of the session.
+          row: column values, created_date defaults to now.
+        """
+        row.setdefault("created_date", datetime.datetime.utcnow())
+        self._queue.put((row, list(rep_events)))
+
+    def _next_batch(self):
+        """Blocks for a first row, then drains up to batch_size rows."""
+        batch = []
+        row = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while row is not None:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                row = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+        return batch, row is None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    # Never lets a bad batch stop the writer for good
+                    logger.exception(f"Dropped {len(batch)} workout session(s)")
+
+    def _insert(self, batch):
+        """Inserts a batch of (session row, rep event rows) pairs."""
+        session = self.db.session
+        sessions, rep_events = [], []
+        for row, events in batch:
+            if events:
+                # Sessions with reps need their primary key for the foreign key
+                result = session.execute(WorkoutSession.__table__.insert(), row)
+                session_id = result.inserted_primary_key[0]
+                rep_events.extend(dict(e, session_id=session_id) for e in events)
+            else:
+                sessions.append(row)
+        if sessions:
+            session.execute(WorkoutSession.__table__.insert(), sessions)
+        if rep_events:
+            session.execute(RepEvent.__table__.insert(), rep_events)
+        LeaderboardRollup.update(session, [row for row, _ in batch])
+
+    def _write(self, batch, max_retries=None):
+        """Writes a batch, retrying transient failures. When it fails for
+        good, writes the rows one by one so only the bad ones are dropped.
+        Args:
+          batch: list of (session row, rep event rows) pairs.
+          max_retries: int, the number of attempts, the writer's if None.
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        with self.app.app_context():
+            for attempt in range(1, max_retries + 1):
+                try:
+                    self._insert(batch)
+                    self.db.session.commit()
+                except DBAPIError as e:
+                    self.db.session.rollback()
+                    retryable = (
+                        isinstance(e, OperationalError) or e.connection_invalidated
+                    )
+                    if retryable and attempt < max_retries:
+                        delay = min(2 ** attempt * 0.1, 5.0)
+                        logger.warning(f"Insert failed ({e}), retrying in {delay:.1f}s")
+                        time.sleep(delay)
+                        continue
+                    logger.error(f"Insert of {len(batch)} session(s) failed: {e}")
+                    self._write_one_by_one(batch)
+                    return
+                except Exception:
+                    # Bad data or a bug, retrying would fail the same way
+                    self.db.session.rollback()
+                    logger.exception(f"Insert of {len(batch)} session(s) failed")
+                    self._write_one_by_one(batch)
+                    return
+
+                logger.info(f"{len(batch)} workout session(s) inserted into db")
+                if self.on_commit is not None:
+                    try:
+                        self.on_commit()
+                    except Exception:
+                        logger.exception("on_commit failed")
+                return
+
+    def _write_one_by_one(self, batch):
+        """Writes the rows of a failed batch separately, each tried once since
+        the batch already went through the retries."""
+        if len(batch) == 1:
+            logger.error("Dropped 1 workout session")
+            return
+        logger.warning(f"Inserting {len(batch)} workout sessions one by one")
+        for item in batch:
+            self._write([item], max_retries=1)
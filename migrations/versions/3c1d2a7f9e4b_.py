@@ -0,0 +1,41 @@
+"""leaderboard rollup table and workout_session date index
+
+Revision ID: 3c1d2a7f9e4b
+Revises: 88f3cf82b5d7
+Create Date: 2026-10-19 09:12:41.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1d2a7f9e4b'
+down_revision = '88f3cf82b5d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('leaderboard_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_name', sa.String(length=80), nullable=False),
+    sa.Column('workout', sa.String(length=80), nullable=False),
+    sa.Column('reps', sa.Integer(), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'user_name', 'workout')
+    )
+    op.create_index(op.f('ix_workout_session_created_date'), 'workout_session', ['created_date'], unique=False)
+
+    # Backfill the rollup from the sessions recorded so far
+    op.execute(
+        "INSERT INTO leaderboard_rollup (day, user_name, workout, reps, sessions) "
+        "SELECT CAST(created_date AS DATE), user_name, workout, SUM(reps), COUNT(*) "
+        "FROM workout_session WHERE created_date IS NOT NULL "
+        "GROUP BY CAST(created_date AS DATE), user_name, workout"
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_workout_session_created_date'), table_name='workout_session')
+    op.drop_table('leaderboard_rollup')
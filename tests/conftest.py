@@ -0,0 +1,80 @@
+import types
+import flask
+import numpy as np
+import pytest
+from hiitpi import db, cache
+from hiitpi.config import TestingConfig
+from hiitpi.features import PoseFeatures
+
+
+@pytest.fixture
+def server(tmp_path):
+    """A bare Flask server with the database and the cache, no camera."""
+    server = flask.Flask(__name__)
+    server.config.from_object(TestingConfig)
+    # A file, since the session writer connects from its own thread
+    server.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'hiitpi.db'}"
+    db.init_app(server)
+    cache.init_app(server)
+    with server.app_context():
+        db.create_all()
+    yield server
+    with server.app_context():
+        db.drop_all()
+        db.engine.dispose()
+
+
+# The PoseNet keypoints, in the order of hiitpi.pose.KEYPOINTS, which needs the
+# Edge TPU library to import
+KEYPOINTS = (
+    "nose",
+    "left eye",
+    "right eye",
+    "left ear",
+    "right ear",
+    "left shoulder",
+    "right shoulder",
+    "left elbow",
+    "right elbow",
+    "left wrist",
+    "right wrist",
+    "left hip",
+    "right hip",
+    "left knee",
+    "right knee",
+    "left ankle",
+    "right ankle",
+)
+
+
+class FakePose(object):
+    """A detected pose, with Pose's attributes."""
+
+    def __init__(self, keypoints, score):
+        self.keypoints = keypoints
+        self.score = score
+        self.features = PoseFeatures(self)
+
+
+@pytest.fixture
+def make_pose():
+    """Builds a pose with its hips at (x, y) and the given torso length
+    (px), every keypoint but the hidden ones scoring 0.9."""
+
+    def make_pose(x=0.0, y=0.0, torso=100.0, score=0.9, hidden=()):
+        offsets = {
+            "left shoulder": (-torso, -torso / 4),
+            "right shoulder": (-torso, torso / 4),
+            "left hip": (0.0, -torso / 4),
+            "right hip": (0.0, torso / 4),
+        }
+        keypoints = {
+            k: types.SimpleNamespace(
+                yx=np.array(offsets.get(k, (0.0, 0.0))) + (y, x),
+                score=0.0 if k in hidden else 0.9,
+            )
+            for k in KEYPOINTS
+        }
+        return FakePose(keypoints, score)
+
+    return make_pose
@@ -0,0 +1,59 @@
+import io
+import csv
+import datetime
+import pytest
+import sqlalchemy as sa
+from hiitpi.export import iter_csv, iter_parquet, parquet_schema
+from hiitpi.model import WorkoutSession
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+COLUMNS = [(c.name, c.type) for c in WorkoutSession.__table__.columns]
+ROWS = [
+    (
+        1,
+        datetime.datetime(2021, 3, 1, 12),
+        "alice",
+        "Jumping Jacks",
+        12,
+        0.5,
+        90.0,
+        5.0,
+        1.5,
+        0.2,
+        18.0,
+        {"rep_duration": {"count": 12}},
+    ),
+]
+
+
+def test_parquet_schema_maps_column_types():
+    schema = parquet_schema(COLUMNS)
+    assert schema.field("id").type == pa.int64()
+    assert schema.field("created_date").type == pa.timestamp("us")
+    assert schema.field("user_name").type == pa.string()
+    assert schema.field("pace").type == pa.float64()
+    assert schema.field("form_stats").type == pa.string()
+
+
+def test_parquet_schema_falls_back_to_strings():
+    schema = parquet_schema([("day", sa.Date()), ("other", sa.LargeBinary())])
+    assert schema.field("day").type == pa.date32()
+    assert schema.field("other").type == pa.string()
+
+
+def test_iter_parquet_round_trips_rows():
+    data = b"".join(iter_parquet(ROWS, COLUMNS, row_group_size=1))
+    table = pq.read_table(io.BytesIO(data))
+    assert table.column_names == [name for name, _ in COLUMNS]
+    (row,) = table.to_pylist()
+    assert row["user_name"] == "alice"
+    assert row["form_stats"] == '{"rep_duration": {"count": 12}}'
+
+
+def test_iter_csv_writes_header_and_json_columns():
+    text = "".join(iter_csv(ROWS, COLUMNS))
+    header, row = csv.reader(io.StringIO(text))
+    assert header[0] == "id" and header[-1] == "form_stats"
+    assert row[-1] == '{"rep_duration": {"count": 12}}'
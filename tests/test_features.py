@@ -0,0 +1,27 @@
+import math
+import pytest
+
+
+def test_scale_is_the_mean_torso_length(make_pose):
+    pose = make_pose(torso=100.0)
+    assert pose.features.scale == pytest.approx(100.0)
+
+
+def test_scale_uses_the_visible_side(make_pose):
+    pose = make_pose(torso=100.0, hidden=("left hip",))
+    assert pose.features.scale == pytest.approx(100.0)
+
+
+def test_scale_is_nan_without_a_torso(make_pose):
+    pose = make_pose(hidden=("left hip", "right shoulder"))
+    assert math.isnan(pose.features.scale)
+
+
+def test_features_are_memoized(make_pose):
+    features = make_pose().features
+    assert features.yx is features.yx
+    assert features.norm("left hip", "right hip") == pytest.approx(50.0)
+    assert features.angle("left hip", "left shoulder", "right hip") == pytest.approx(
+        90.0
+    )
+    assert features.visible(("left hip", "right hip"))
@@ -0,0 +1,36 @@
+import datetime
+from hiitpi import db
+from hiitpi.leaderboard import leaderboard_figure, version, bump_version
+from hiitpi.writer import SessionWriter
+
+
+def players(figure):
+    return {name for trace in figure["data"] for name in trace["y"]}
+
+
+def test_bump_version_increments(server):
+    with server.app_context():
+        assert version() == 0
+        bump_version()
+        bump_version()
+        assert version() == 2
+
+
+def test_committed_session_appears_on_the_leaderboard(server):
+    since = datetime.date(2021, 3, 1)
+    with server.app_context():
+        assert players(leaderboard_figure(since, version())) == set()
+
+    writer = SessionWriter(server, db, on_commit=bump_version, flush_interval=0.05)
+    writer.start()
+    writer.put(
+        created_date=datetime.datetime(2021, 3, 2, 12),
+        user_name="alice",
+        workout="Jumping Jacks",
+        reps=12,
+        pace=0.5,
+    )
+    writer.close()
+
+    with server.app_context():
+        assert players(leaderboard_figure(since, version())) == {"alice"}
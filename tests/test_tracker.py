@@ -0,0 +1,33 @@
+from hiitpi.tracker import PoseTracker
+
+
+def test_keeps_ids_of_moving_people(make_pose):
+    tracker = PoseTracker()
+    first = tracker.update([make_pose(x=100), make_pose(x=400)], now=0.0)
+    second = tracker.update([make_pose(x=420), make_pose(x=110)], now=0.1)
+    assert {i: p.features.centroid[1] for i, p in first.items()} == {
+        1: 100,
+        2: 400,
+    }
+    assert {i: round(p.features.centroid[1]) for i, p in second.items()} == {
+        1: 110,
+        2: 420,
+    }
+
+
+def test_matching_distance_scales_with_the_body(make_pose):
+    # The same 100px shift is a step up close, and another person far away
+    near, far = PoseTracker(), PoseTracker()
+    near.update([make_pose(x=100, torso=200)], now=0.0)
+    far.update([make_pose(x=100, torso=40)], now=0.0)
+    assert list(near.update([make_pose(x=200, torso=200)], now=0.1)) == [1]
+    assert list(far.update([make_pose(x=200, torso=40)], now=0.1)) == [2]
+
+
+def test_ignores_weak_poses_and_expires_lost_people(make_pose):
+    tracker = PoseTracker(max_age=1.0)
+    assert list(tracker.update([make_pose(), make_pose(x=300, score=0.1)], 0)) == [1]
+    tracker.update([], now=0.5)
+    assert tracker.expired == []
+    tracker.update([], now=1.5)
+    assert tracker.expired == [1]
@@ -0,0 +1,52 @@
+import types
+from hiitpi.redisclient import RedisClient
+from hiitpi.watchdog import Watchdog
+
+
+class FailingModel(object):
+    """A ModelLoader whose loads fail until `fixed` is set."""
+
+    def __init__(self):
+        self.ready = False
+        self.loading = False
+        self.error = RuntimeError("no Edge TPU")
+        self.reloads = 0
+        self.fixed = False
+
+    def reload(self):
+        self.reloads += 1
+        if self.fixed:
+            self.ready, self.error = True, None
+
+
+def station():
+    redis = RedisClient(None, None, None, namespace="station:0", backend="memory")
+    return types.SimpleNamespace(running=True, redis=redis)
+
+
+def test_retries_a_failed_model_load_with_backoff():
+    model, stations = FailingModel(), [station()]
+    watchdog = Watchdog(stations, model, retry_delay=1.0, max_retry_delay=4.0)
+
+    retried = [t for t in range(0, 20) if watchdog.check_model(now=float(t))]
+    # After 1s, then 2s, 4s and 4s again after each failed retry
+    assert retried == [1, 3, 7, 11, 15, 19]
+    assert model.reloads == 6
+    assert stations[0].redis.hgetall("metrics")["model_reload_retries"] == 6
+
+
+def test_stops_retrying_once_the_model_loads():
+    model = FailingModel()
+    watchdog = Watchdog([station()], model, retry_delay=1.0)
+    model.fixed = True
+    assert watchdog.check_model(now=0.0) is False
+    assert watchdog.check_model(now=1.0) is True
+    assert model.ready
+    assert not any(watchdog.check_model(now=float(t)) for t in range(2, 100))
+
+
+def test_waits_for_a_load_in_progress():
+    model = FailingModel()
+    model.error, model.loading = None, True
+    watchdog = Watchdog([station()], model, retry_delay=1.0)
+    assert not any(watchdog.check_model(now=float(t)) for t in range(10))
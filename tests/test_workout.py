@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from hiitpi.workout import PeakCounter, RunningStats
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_peak_counter_counts_noisy_reps(seed):
+    # 10 reps of a 40 degree swing at 15 samples each, with heavy pose jitter
+    rng = np.random.default_rng(seed)
+    t = np.arange(10 * 15 + 8)
+    angle = 90 - 40 * np.cos(2 * np.pi * np.minimum(t, 150) / 15)
+    angle += rng.normal(0, 15, len(t))
+
+    counter = PeakCounter(hysteresis=30)
+    assert sum(counter.update(x) for x in angle) == 10
+
+
+def test_peak_counter_ignores_jitter_at_rest():
+    rng = np.random.default_rng(0)
+    counter = PeakCounter(hysteresis=30)
+    assert not any(counter.update(x) for x in 90 + rng.normal(0, 8, 300))
+
+
+def test_running_stats_match_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.normal(60, 20, 1000)
+    stats = RunningStats(bins=(0, 30, 60, 90, 120))
+    for x in values:
+        stats.update(np.float32(x))
+
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(values.mean(), rel=1e-5)
+    assert stats.std == pytest.approx(values.std(ddof=1), rel=1e-4)
+    assert stats.min == pytest.approx(values.min(), rel=1e-5)
+    assert stats.total == pytest.approx(values.sum(), rel=1e-5)
+    # Out of range values go to the first and last bins
+    assert sum(stats.histogram) == len(values)
+    assert stats.histogram[0] == np.sum(values < 30)
+    assert isinstance(stats.mean, float)
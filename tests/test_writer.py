@@ -0,0 +1,67 @@
+import datetime
+from hiitpi import db
+from hiitpi.model import WorkoutSession, RepEvent, LeaderboardRollup
+from hiitpi.writer import SessionWriter
+
+
+def session_row(user_name, reps=10):
+    return {
+        "created_date": datetime.datetime(2021, 3, 1, 12),
+        "user_name": user_name,
+        "workout": "Jumping Jacks",
+        "reps": reps,
+        "pace": 0.5,
+    }
+
+
+def write(server, rows, **kwargs):
+    writer = SessionWriter(server, db, flush_interval=0.05, **kwargs).start()
+    for row, rep_events in rows:
+        writer.put(rep_events=rep_events, **row)
+    writer.close()
+
+
+def test_writes_sessions_rep_events_and_rollup(server):
+    rep_event = {
+        "created_date": datetime.datetime(2021, 3, 1, 12),
+        "rep": 1,
+        "duration": 1.5,
+        "range_of_motion": 90.0,
+        "angles_min": {"j_lelbow_angle": 45.0},
+        "angles_max": {"j_lelbow_angle": 135.0},
+    }
+    commits = []
+    write(
+        server,
+        [(session_row("alice"), [rep_event]), (session_row("bob", reps=5), [])],
+        on_commit=lambda: commits.append(True),
+    )
+
+    with server.app_context():
+        assert {s.user_name for s in WorkoutSession.query} == {"alice", "bob"}
+        (event,) = RepEvent.query.all()
+        assert (
+            event.session_id
+            == WorkoutSession.query.filter_by(user_name="alice").one().id
+        )
+        assert sum(r.reps for r in LeaderboardRollup.query) == 15
+    assert commits
+
+
+def test_drops_only_the_bad_session_of_a_batch(server):
+    # A NULL user_name fails with an IntegrityError, which is not retried
+    rows = [session_row(name) for name in ("alice", None, "bob", "carol")]
+    write(server, [(row, []) for row in rows], max_retries=2)
+
+    with server.app_context():
+        names = {s.user_name for s in WorkoutSession.query}
+        assert names == {"alice", "bob", "carol"}
+        assert sum(r.reps for r in LeaderboardRollup.query) == 30
+
+
+def test_keeps_writing_after_a_failed_batch(server):
+    rows = [dict(session_row("alice"), reps=None), session_row("bob")]
+    write(server, [(row, []) for row in rows], batch_size=1)
+
+    with server.app_context():
+        assert [s.user_name for s in WorkoutSession.query] == ["bob"]